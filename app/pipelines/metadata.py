@@ -1,7 +1,8 @@
 # app/pipelines/metadata.py
 from __future__ import annotations
 from PIL import Image, ExifTags
-from ..utils.exif import write_exif_datetime, write_xmp_people_sidecar
+from collections import defaultdict
+from ..utils.exif import write_exif_datetime_many, write_xmp_people_sidecar
 
 # Map EXIF tag names to IDs once
 _EXIF_TAGS = {v: k for k, v in ExifTags.TAGS.items()}
@@ -27,11 +28,15 @@ def extract_exif_datetime(path: str) -> str | None:
     return None
 
 
+def writeback_dates(rows) -> int:
+    """Write each row's inferred_date; photos sharing a date go to exiftool as one command."""
+    by_date: dict[str, list[str]] = defaultdict(list)
+    for row in rows:
+        by_date[row["inferred_date"]].append(row["path"])
+    return sum(write_exif_datetime_many(paths, dt) for dt, paths in by_date.items())
+
+
 def writeback_high_confidence(db) -> int:
-    changed = 0
-    for row in db.iter_all():
-        if row["inferred_date"] and (row["confidence"] or 0) >= 0.75:
-            ok = write_exif_datetime(row["path"], row["inferred_date"])
-            if ok:
-                changed += 1
-    return changed
+    return writeback_dates(
+        row for row in db.iter_all()
+        if row["inferred_date"] and (row["confidence"] or 0) >= 0.75)
@@ -11,6 +11,7 @@ from typing import List, Optional
 
 from PySide6 import QtCore
 
+from ..utils.sqlite import open_conn
 from ..widgets.grid_gallery import GalleryItem
 from .metadata import writeback_metadata
 
@@ -20,16 +21,31 @@ SUPPORTED_EXT = {".jpg", ".jpeg", ".png", ".webp", ".tif", ".tiff",
 
 class Store(QtCore.QObject):
     aiTagUpdated = QtCore.Signal(object)
+    itemsChanged = QtCore.Signal()  # images added; cached item lists are stale
+    itemSaved = QtCore.Signal(object)  # one item's tags saved; refresh just that entry
 
     def __init__(self, db_path: Path | None = None):
         super().__init__()
         self.db_path = Path(
             db_path) if db_path else Path.home() / ".photochrono.db"
+        self._conn: Optional[sqlite3.Connection] = None
         self._ensure_db()
 
+    def connection(self) -> sqlite3.Connection:
+        """The library's one connection (WAL, tuned pragmas), shared with the tagging dock."""
+        if self._conn is None:
+            self._conn = open_conn(str(self.db_path))
+        return self._conn
+
+    def close(self):
+        """Close the shared connection; a later call to connection() opens a new one."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
     # --- DB bootstrap
     def _ensure_db(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connection()
         cur = conn.cursor()
         cur.executescript(
             """
@@ -49,14 +65,13 @@ class Store(QtCore.QObject):
             """
         )
         conn.commit()
-        conn.close()
 
     # --- Import
     def import_folder(self, folder: Path) -> int:
         folder = Path(folder)
         if not folder.exists():
             return 0
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connection()
         cur = conn.cursor()
         imported = 0
         for root, _, files in os.walk(folder):
@@ -73,22 +88,25 @@ class Store(QtCore.QObject):
                 except sqlite3.IntegrityError:
                     pass
         conn.commit()
-        conn.close()
+        if imported:
+            self.itemsChanged.emit()
         return imported
 
     def import_path(self, path: Path) -> GalleryItem:
         """Index a single file and return its GalleryItem (existing or new)."""
         path = Path(path)
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connection()
         cur = conn.cursor()
         h = self._quick_hash(path)
         cur.execute("INSERT OR IGNORE INTO images(path, added_at, hash) VALUES(?,?,?)", (str(
             path), datetime.utcnow().isoformat(), h))
+        added = cur.rowcount > 0
         conn.commit()
         cur.execute(
             "SELECT i.id, i.path, t.tags_json FROM images i LEFT JOIN image_tags t ON i.id=t.image_id WHERE i.path=?", (str(path),))
         row = cur.fetchone()
-        conn.close()
+        if added:
+            self.itemsChanged.emit()
         image_id, ipath, tags_json = row
         return GalleryItem(id=image_id, path=Path(ipath), tags=json.loads(tags_json) if tags_json else {})
 
@@ -112,43 +130,39 @@ class Store(QtCore.QObject):
         return items
 
     def load_all(self) -> List[GalleryItem]:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connection()
         cur = conn.cursor()
         cur.execute(
             "SELECT i.id, i.path, t.tags_json FROM images i LEFT JOIN image_tags t ON i.id=t.image_id ORDER BY i.added_at DESC")
         rows = cur.fetchall()
-        conn.close()
         return self._items_from_rows(rows)
 
     def load_recent(self, days: int = 7) -> List[GalleryItem]:
         since = (datetime.utcnow() - timedelta(days=days)).isoformat()
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connection()
         cur = conn.cursor()
         cur.execute("SELECT i.id, i.path, t.tags_json FROM images i LEFT JOIN image_tags t ON i.id=t.image_id WHERE i.added_at >= ? ORDER BY i.added_at DESC", (since,))
         rows = cur.fetchall()
-        conn.close()
         return self._items_from_rows(rows)
 
     def count_all(self) -> int:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connection()
         cur = conn.cursor()
         cur.execute("SELECT COUNT(*) FROM images")
         (n,) = cur.fetchone()
-        conn.close()
         return int(n)
 
     def count_recent(self, days: int = 7) -> int:
         since = (datetime.utcnow() - timedelta(days=days)).isoformat()
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connection()
         cur = conn.cursor()
         cur.execute("SELECT COUNT(*) FROM images WHERE added_at >= ?", (since,))
         (n,) = cur.fetchone()
-        conn.close()
         return int(n)
 
     # --- Save tags
     def save_item(self, item: GalleryItem):
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connection()
         cur = conn.cursor()
         cur.execute(
             """INSERT INTO image_tags(image_id, tags_json, updated_at)
@@ -159,10 +173,10 @@ class Store(QtCore.QObject):
             (item.id, json.dumps(item.tags or {}), datetime.utcnow().isoformat())
         )
         conn.commit()
-        conn.close()
 
         # --- NEW: also write tags to EXIF ---
         ok, msg = writeback_metadata(item, db_path=self.db_path)
         if not ok:
             print(
                 f"[Store.save_item] Metadata writeback failed for {item.path}: {msg}")
+        self.itemSaved.emit(item)
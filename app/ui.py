@@ -12,6 +12,7 @@ from PySide6.QtWidgets import (
     QProgressBar,
     QPlainTextEdit,
     QHBoxLayout,
+    QApplication,
 )
 from PySide6.QtCore import QThread, Signal, Qt
 import os
@@ -24,8 +25,33 @@ from .state import AppState
 from .pipelines.date_infer import DateInfer
 from .pipelines.face import FaceIndexer
 from .pipelines.enhance import quick_enhance, super_enhance
-from .pipelines.metadata import extract_exif_datetime, writeback_high_confidence
-from .utils.exif import write_exif_datetime
+from .pipelines.metadata import extract_exif_datetime, writeback_high_confidence, writeback_dates
+
+
+# files per import transaction
+IMPORT_BATCH = 500
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".tif", ".tiff", ".heic", ".bmp")
+
+
+def _scan_images(folder: str):
+    """
+    Yield (path, fs_date) for images under `folder`. Extensions are checked
+    on the name first, so non-images are never stat'ed; images take their
+    mtime from the DirEntry (free from the listing on Windows, one stat elsewhere).
+    """
+    try:
+        it = os.scandir(folder)
+    except OSError:
+        return
+    with it:
+        for e in it:
+            try:
+                if e.is_dir(follow_symlinks=False):
+                    yield from _scan_images(e.path)
+                elif e.name.lower().endswith(IMAGE_EXTS) and e.is_file():
+                    yield e.path, str(int(e.stat().st_mtime))
+            except OSError:
+                continue
 
 
 class ImportThread(QThread):
@@ -39,32 +65,46 @@ class ImportThread(QThread):
 
     def run(self):
         count = 0
-        filepaths = []
-        for root, _, files in os.walk(self.folder):
-            for f in files:
-                path = os.path.join(root, f)
-                if f.lower().endswith((".jpg", ".jpeg", ".png", ".tif", ".tiff", ".heic", ".bmp")):
-                    filepaths.append(path)
-
-        total = len(filepaths)
+        entries = list(_scan_images(self.folder))
+
+        total = len(entries)
         app_logger.log(f"Import: found {total} candidate files.")
 
-        for i, path in enumerate(filepaths, start=1):
-            try:
-                self.db.insert_photo_if_absent(path)
+        for start in range(0, total, IMPORT_BATCH):
+            chunk = entries[start:start + IMPORT_BATCH]
+            # read EXIF outside the DB lock, then write the whole chunk in one commit
+            exif = {}
+            for path, _ in chunk:
                 exif_dt = extract_exif_datetime(path)
                 if exif_dt:
-                    row = self.db.find_by_path(path)
-                    if row:
-                        self.db.update_exif_date(row["id"], exif_dt)
+                    exif[path] = exif_dt
+            try:
+                with self.db.transaction():
+                    self.db.insert_photos_bulk(chunk)
+                    self.db.update_exif_dates_by_path(exif.items())
+                count += len(chunk)
+            except Exception:
+                # one bad row rolled back the chunk; redo it file by file so only that one is lost
+                count += self._import_one_by_one(chunk, exif)
+            self.progress.emit(start + len(chunk), total)
+
+        if count:
+            self.db.analyze()
+        self.done.emit(count)
+
+    def _import_one_by_one(self, chunk, exif) -> int:
+        ok = 0
+        for path, fs_date in chunk:
+            try:
+                with self.db.transaction():
+                    self.db.insert_photos_bulk([(path, fs_date)])
+                    if path in exif:
+                        self.db.update_exif_dates_by_path([(path, exif[path])])
+                ok += 1
             except Exception as e:
                 app_logger.log(
                     f"Import error on {os.path.basename(path)}: {e}")
-
-            self.progress.emit(i, total)
-            count += 1
-
-        self.done.emit(count)
+        return ok
 
 
 class PhotoChronoWindow(QMainWindow):
@@ -74,6 +114,7 @@ class PhotoChronoWindow(QMainWindow):
         self.resize(1100, 700)
 
         self.db = DB("data/photochrono.db")
+        QApplication.instance().aboutToQuit.connect(self.db.close)
         self.state = AppState()
         self.date_infer = DateInfer(self.db)
 
@@ -265,11 +306,8 @@ class PhotoChronoWindow(QMainWindow):
 
     def _writeback_all(self):
         self._log("Write-back (ALL inferred) started…")
-        changed = 0
-        for row in self.db.iter_all():
-            if row["inferred_date"]:
-                if write_exif_datetime(row["path"], row["inferred_date"]):
-                    changed += 1
+        changed = writeback_dates(
+            row for row in self.db.iter_all() if row["inferred_date"])
         self._log(f"Write-back (ALL) complete. Updated {changed} photos.")
         QMessageBox.information(self, "Write-back (ALL)",
                                 f"Wrote metadata for {changed} photos.")
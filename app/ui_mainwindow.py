@@ -85,15 +85,17 @@ class PhotoChronoWindow(QtWidgets.QMainWindow):
         self.import_grid.selectionChanged.connect(self._on_selection_changed)
         self.edit_grid.selectionChanged.connect(self._on_selection_changed)
 
-        # Metadata writeback: any tag changes (manual or AI) trigger persist
-        self.library_tags.tagChanged.connect(self._on_tag_changed)
-        self.import_tags.tagChanged.connect(self._on_tag_changed)
+        # Metadata writeback for AI tags; the tagging sidebars save their own
+        # edits (debounced) before emitting tagChanged
         self.store.aiTagUpdated.connect(
             self._on_tag_changed)  # AI pipeline hook
 
         # Initial load
         self.refresh_views()
 
+        # connected after the sidebars, so their pending saves flush before this closes the DB
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self.store.close)
+
     # ---- Slots ----
     @QtCore.Slot(object)
     def _on_selection_changed(self, item):
@@ -1,54 +1,166 @@
 # app/ui_tagging.py
 from __future__ import annotations
 
+import bisect
+import json
 import os
+import queue
+import re
 import sqlite3
+from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import List, Optional, Tuple, Dict, Set
+from typing import Callable, List, Optional, Sequence, Tuple, Dict, Set
 
-from PySide6.QtCore import Qt, QDate, QSize, QPointF, QRectF, QTimer
-from PySide6.QtGui import QPixmap, QPainter, QPen, QColor, QImageReader
+import numpy as np
+from PySide6.QtCore import (
+    Qt, QDate, QSize, QPointF, QRectF, QTimer, QObject, QRunnable, QThreadPool, Signal
+)
+from PySide6.QtGui import QPixmap, QPainter, QPen, QColor, QImage, QImageReader
 from PySide6.QtWidgets import (
     QWidget, QDockWidget, QLabel, QPushButton, QLineEdit, QComboBox,
     QHBoxLayout, QVBoxLayout, QMessageBox, QCheckBox, QSplitter, QSizePolicy,
-    QGroupBox, QToolButton, QCalendarWidget, QToolTip
+    QGroupBox, QToolButton, QCalendarWidget, QToolTip, QApplication
 )
 
+from .utils.phash import hamming_within
+from .utils.sqlite import Conn, open_conn, tune_conn
+
 # ---------- Small Utilities ----------
 
 
-def _open_conn(db_or_conn) -> sqlite3.Connection:
-    if isinstance(db_or_conn, sqlite3.Connection):
-        return db_or_conn
-    db_path = db_or_conn or "data/photochrono.db"
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+def _in_shape(ids: Sequence) -> Tuple[str, List]:
+    """
+    Placeholders for `IN (...)`, rounded up to a power of two so the statement
+    cache sees a handful of SQL shapes instead of one per selection size.
+    The padding repeats the first id, which IN ignores.
+    """
+    ids = list(ids)
+    n = 1 << max(0, len(ids) - 1).bit_length()
+    return ",".join("?" * n), ids + [ids[0]] * (n - len(ids))
+
+
+def _db_file(conn: sqlite3.Connection) -> str:
+    """On-disk path of the connection's main database ('' when in-memory)."""
+    for row in conn.execute("PRAGMA database_list"):
+        if row[1] == "main":
+            return row[2] or ""
+    return ""
+
+
+def _open_writer_conn(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Second connection to the same DB, owned by the background write thread."""
+    path = _db_file(conn)
+    if not path:
+        return conn  # in-memory DB can't be shared; writes stay on the caller's thread
+    w = sqlite3.connect(path, check_same_thread=False, isolation_level=None,
+                        cached_statements=256, factory=Conn)
+    w.row_factory = sqlite3.Row
+    tune_conn(w)
+    return w
+
+
+def _open_reader_pool(conn: sqlite3.Connection, size: int = 4) -> Optional[queue.LifoQueue]:
+    """Small pool of read-only connections; None when the DB can't be reopened (in-memory)."""
+    path = _db_file(conn)
+    if not path:
+        return None
+    pool: queue.LifoQueue = queue.LifoQueue(maxsize=size)
+    for _ in range(size):
+        r = sqlite3.connect(f"file:{path}?mode=ro&cache=private",
+                            uri=True, check_same_thread=False, cached_statements=256)
+        r.row_factory = sqlite3.Row
+        pool.put(r)
+    return pool
 
 
 def _ensure_core_tables(conn: sqlite3.Connection) -> None:
-    conn.executescript("""
-    CREATE TABLE IF NOT EXISTS people (
-      person_id INTEGER PRIMARY KEY,
-      display_name TEXT NOT NULL,
-      alias TEXT,
-      created_at TEXT DEFAULT CURRENT_TIMESTAMP
-    );
-    CREATE TABLE IF NOT EXISTS photo_tags (
-      photo_id INTEGER NOT NULL,
-      tag_type TEXT NOT NULL CHECK(tag_type IN ('person','date','keyword')),
-      tag_value TEXT NOT NULL,
-      source TEXT NOT NULL,
-      confidence REAL DEFAULT 1.0,
-      created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-      PRIMARY KEY(photo_id, tag_type, tag_value)
-    );
-    CREATE TABLE IF NOT EXISTS phash (
-      photo_id INTEGER PRIMARY KEY,
-      phash_hex TEXT NOT NULL
-    );
+    if getattr(conn, "_core_tables_ready", False):
+        return
+    try:
+        # BEGIN in the script keeps DDL, backfill and ANALYZE in one transaction (one commit)
+        conn.executescript("""
+        BEGIN;
+        CREATE TABLE IF NOT EXISTS people (
+          person_id INTEGER PRIMARY KEY,
+          display_name TEXT NOT NULL,
+          alias TEXT,
+          created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE IF NOT EXISTS photo_tags (
+          photo_id INTEGER NOT NULL,
+          tag_type TEXT NOT NULL CHECK(tag_type IN ('person','date','keyword')),
+          tag_value TEXT NOT NULL,
+          source TEXT NOT NULL,
+          confidence REAL DEFAULT 1.0,
+          created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+          PRIMARY KEY(photo_id, tag_type, tag_value)
+        );
+        CREATE TABLE IF NOT EXISTS phash (
+          photo_id INTEGER PRIMARY KEY,
+          phash_u64 INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS face_boxes (
+          photo_id INTEGER NOT NULL,
+          face_id INTEGER NOT NULL,
+          x REAL NOT NULL, y REAL NOT NULL, w REAL NOT NULL, h REAL NOT NULL,
+          embedding BLOB, cluster_id TEXT, assigned_person_id INTEGER,
+          source TEXT DEFAULT 'detector', confidence REAL DEFAULT 0.0,
+          PRIMARY KEY(photo_id, face_id)
+        );
+        -- lookups by photo_id alone are already served by the primary keys
+        CREATE INDEX IF NOT EXISTS idx_phototags_value ON photo_tags(tag_type, tag_value);
+        CREATE INDEX IF NOT EXISTS idx_face_photo_person ON face_boxes(photo_id, assigned_person_id);
+        CREATE INDEX IF NOT EXISTS idx_face_cluster ON face_boxes(cluster_id) WHERE cluster_id IS NOT NULL;
+        """)
+        rebuilt = _ensure_phash_compact(conn)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_phash_u64 ON phash(phash_u64)")
+        # give the planner statistics once; later runs keep the existing sqlite_stat1
+        if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_stat1'").fetchone():
+            conn.execute("ANALYZE")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if rebuilt:
+        conn.execute("VACUUM")  # once, to hand back the pages the hex column used
+    try:
+        conn._core_tables_ready = True
+    except AttributeError:
+        pass  # plain Connection: the IF NOT EXISTS checks just run again
+
+
+def phash_to_u64(phash_hex: str) -> int:
+    """64-bit pHash hex -> signed INTEGER key (offset by 2**63 to fit SQLite)."""
+    return int(phash_hex, 16) - (1 << 63)
+
+
+def _ensure_phash_compact(conn: sqlite3.Connection) -> bool:
+    """
+    Rebuild older phash tables (rowid, phash_hex TEXT, nullable phash_u64) as
+    WITHOUT ROWID holding only the 8-byte integer key. Returns True when it
+    rebuilt, so the caller can VACUUM once the transaction is committed.
+    """
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type='table' AND name='phash'").fetchone()
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(phash)")]
+    if not row or "phash_hex" not in cols:
+        return False
+    key_col = "phash_u64" if "phash_u64" in cols else "NULL"
+    old = conn.execute(
+        f"SELECT photo_id, phash_hex, {key_col} FROM phash WHERE photo_id IS NOT NULL").fetchall()
+    conn.execute("DROP TABLE phash")  # its indexes go with it
+    conn.execute("""
+        CREATE TABLE phash (
+          photo_id INTEGER PRIMARY KEY,
+          phash_u64 INTEGER NOT NULL
+        ) WITHOUT ROWID
     """)
-    conn.commit()
+    conn.executemany(
+        "INSERT OR REPLACE INTO phash(photo_id, phash_u64) VALUES (?,?)",
+        [(pid, key if key is not None else phash_to_u64(ph)) for pid, ph, key in old])
+    return True
 
 
 TABLE_CANDIDATES = ["photos", "images", "files", "media", "assets", "items"]
@@ -68,7 +180,7 @@ def _norm_path(p: str) -> str:
 class PhotoItem:
     photo_id: int
     path: str
-    phash: Optional[str] = None
+    phash: Optional[int] = None  # phash_u64 key
 
 
 # ---------- DB helpers ----------
@@ -155,16 +267,57 @@ def replace_date_tag(conn: sqlite3.Connection, photo_id: int, iso_dt: str,
     """, (photo_id, iso_dt, source, conf))
 
 
-def fetch_phash(conn: sqlite3.Connection, photo_id: int) -> Optional[str]:
+def replace_date_tags(conn: sqlite3.Connection, photo_ids: Sequence[int], iso_dt: str,
+                      source: str = "propagated", conf: float = 0.95) -> None:
+    """Batch form of replace_date_tag: one prepared DELETE and INSERT for all photos."""
+    conn.executemany(
+        "DELETE FROM photo_tags WHERE photo_id=? AND tag_type='date'",
+        [(pid,) for pid in photo_ids])
+    conn.executemany("""
+        INSERT INTO photo_tags(photo_id, tag_type, tag_value, source, confidence)
+        VALUES (?, 'date', ?, ?, ?)
+    """, [(pid, iso_dt, source, conf) for pid in photo_ids])
+
+
+def fetch_phash(conn: sqlite3.Connection, photo_id: int) -> Optional[int]:
+    """The photo's phash_u64 key (see phash_to_u64), or None if not hashed yet."""
     row = conn.execute(
-        "SELECT phash_hex FROM phash WHERE photo_id=?", (photo_id,)).fetchone()
-    return row["phash_hex"] if row else None
+        "SELECT phash_u64 FROM phash WHERE photo_id=?", (photo_id,)).fetchone()
+    return row[0] if row else None
 
 
-def photos_by_phash(conn: sqlite3.Connection, phash_hex: str) -> List[int]:
-    rows = conn.execute(
-        "SELECT photo_id FROM phash WHERE phash_hex=?", (phash_hex,)).fetchall()
-    return [r["photo_id"] for r in rows]
+# bits two pHashes may differ by and still count as the same picture (rescans, re-encodes)
+DUPE_MAX_DIST = 4
+
+
+def _phash_arrays(conn: sqlite3.Connection) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (photo_ids, phash_u64) as int64 arrays, cached on the connection until
+    something writes: another connection's commit moves PRAGMA data_version,
+    this connection's own writes move total_changes.
+    """
+    version = (conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes)
+    cached = getattr(conn, "_phash_arrays", None)
+    if cached is not None and cached[0] == version:
+        return cached[1], cached[2]
+    rows = conn.execute("SELECT photo_id, phash_u64 FROM phash").fetchall()
+    pids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    keys = np.fromiter((r[1] for r in rows), dtype=np.int64, count=len(rows))
+    try:
+        conn._phash_arrays = (version, pids, keys)
+    except AttributeError:
+        pass
+    return pids, keys
+
+
+def photos_by_phash(conn: sqlite3.Connection, phash_u64: int, max_dist: int = 0) -> List[int]:
+    """Photos whose pHash is within `max_dist` bits; 0 is an exact (indexed) match."""
+    if max_dist <= 0:
+        rows = conn.execute(
+            "SELECT photo_id FROM phash WHERE phash_u64=?", (phash_u64,)).fetchall()
+        return [r["photo_id"] for r in rows]
+    pids, keys = _phash_arrays(conn)
+    return sorted(pids[hamming_within(phash_u64, keys, max_dist)].tolist())
 
 
 def fetch_tags_for_photo(conn: sqlite3.Connection, photo_id: int) -> Tuple[List[sqlite3.Row], List[sqlite3.Row]]:
@@ -187,15 +340,6 @@ def fetch_tags_for_photo(conn: sqlite3.Connection, photo_id: int) -> Tuple[List[
 
 
 def fetch_faces_for_photo(conn: sqlite3.Connection, photo_id: int) -> List[sqlite3.Row]:
-    conn.execute("""
-    CREATE TABLE IF NOT EXISTS face_boxes (
-      photo_id INTEGER NOT NULL,
-      face_id INTEGER NOT NULL,
-      x REAL NOT NULL, y REAL NOT NULL, w REAL NOT NULL, h REAL NOT NULL,
-      embedding BLOB, cluster_id TEXT, assigned_person_id INTEGER,
-      source TEXT DEFAULT 'detector', confidence REAL DEFAULT 0.0,
-      PRIMARY KEY(photo_id, face_id)
-    );""")
     return conn.execute("""
         SELECT fb.photo_id, fb.face_id, fb.x, fb.y, fb.w, fb.h,
                fb.cluster_id, fb.assigned_person_id, fb.confidence,
@@ -207,6 +351,21 @@ def fetch_faces_for_photo(conn: sqlite3.Connection, photo_id: int) -> List[sqlit
     """, (photo_id,)).fetchall()
 
 
+def fetch_photo_bundle(conn: sqlite3.Connection, photo_id: int
+                       ) -> Tuple[List[sqlite3.Row], List[sqlite3.Row], List[sqlite3.Row]]:
+    """(faces, people, dates) for one photo, read inside a single read transaction."""
+    own_txn = not conn.in_transaction
+    if own_txn:
+        conn.execute("BEGIN")
+    try:
+        faces = fetch_faces_for_photo(conn, photo_id)
+        people, dates = fetch_tags_for_photo(conn, photo_id)
+    finally:
+        if own_txn:
+            conn.commit()
+    return faces, people, dates
+
+
 # ---------- Batch ----------
 
 @dataclass
@@ -214,33 +373,72 @@ class BatchConfig:
     limit: int = 500
 
 
-def build_simple_tagging_batch(conn: sqlite3.Connection, cfg: BatchConfig = BatchConfig()) -> List[PhotoItem]:
+_IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+@dataclass(frozen=True)
+class _PhotosSQL:
+    """Detected photos table plus the batch queries formatted against it."""
+    table: str
+    id_col: str
+    path_col: str
+    reps: str
+    without_hash: str
+    filler: str
+
+
+def _photos_sql(conn: sqlite3.Connection) -> _PhotosSQL:
+    """detect_photos_table once per connection; the SQL is validated and built here too."""
+    cached = getattr(conn, "_photos_table", None)
+    if cached is not None:
+        return cached
     table, id_col, path_col = detect_photos_table(conn)
+    for name in (table, id_col, path_col):
+        if not _IDENT_RE.match(name):
+            raise RuntimeError(f"Unsafe identifier in photos table: {name!r}")
+    sql = _PhotosSQL(
+        table, id_col, path_col,
+        # lowest photo_id per hash, grouped inside SQLite over idx_phash_u64
+        reps=f"""
+            SELECT t.{id_col} AS pid, t.{path_col} AS pth, g.ph
+            FROM (SELECT MIN(photo_id) AS pid, phash_u64 AS ph
+                  FROM phash GROUP BY phash_u64) g
+            JOIN {table} t ON t.{id_col} = g.pid
+        """,
+        # antijoin: one phash PK probe per row instead of materializing NOT IN
+        without_hash=f"""
+            SELECT t.{id_col} AS pid, t.{path_col} AS pth
+            FROM {table} t
+            LEFT JOIN phash p ON p.photo_id = t.{id_col}
+            WHERE p.photo_id IS NULL
+            LIMIT ?
+        """,
+        filler=f"""
+            SELECT t.{id_col} AS pid, t.{path_col} AS pth, p.phash_u64 AS ph
+            FROM {table} t
+            LEFT JOIN phash p ON p.photo_id = t.{id_col}
+            LIMIT ?
+        """,
+    )
+    try:
+        conn._photos_table = sql
+    except AttributeError:
+        pass  # caller-supplied plain Connection: detect again next time
+    return sql
+
+
+def build_simple_tagging_batch(conn: sqlite3.Connection, cfg: BatchConfig = BatchConfig()) -> List[PhotoItem]:
+    sql = _photos_sql(conn)
     reps: List[PhotoItem] = []
 
     # representative per phash (lowest id)
-    rows = conn.execute("SELECT photo_id, phash_hex FROM phash").fetchall()
-    best: Dict[str, int] = {}
-    for r in rows:
-        pid, ph = r["photo_id"], r["phash_hex"]
-        if ph not in best or pid < best[ph]:
-            best[ph] = pid
-    if best:
-        ids_tuple = tuple(best.values())
-        q = f"SELECT {id_col} AS pid, {path_col} AS pth FROM {table} WHERE {id_col} IN ({','.join(['?']*len(ids_tuple))})"
-        rep_rows = conn.execute(q, ids_tuple).fetchall()
-        for rr in rep_rows:
-            reps.append(PhotoItem(
-                photo_id=rr["pid"], path=rr["pth"], phash=fetch_phash(conn, rr["pid"])))
+    for rr in conn.execute(sql.reps):
+        reps.append(PhotoItem(photo_id=rr["pid"], path=rr["pth"], phash=rr["ph"]))
 
     # any without a phash yet
     if len(reps) < cfg.limit:
-        without_hash = conn.execute(f"""
-            SELECT {id_col} AS pid, {path_col} AS pth
-            FROM {table}
-            WHERE {id_col} NOT IN (SELECT photo_id FROM phash)
-            LIMIT ?
-        """, (cfg.limit - len(reps),)).fetchall()
+        without_hash = conn.execute(
+            sql.without_hash, (cfg.limit - len(reps),)).fetchall()
         for r in without_hash:
             reps.append(
                 PhotoItem(photo_id=r["pid"], path=r["pth"], phash=None))
@@ -251,14 +449,13 @@ def build_simple_tagging_batch(conn: sqlite3.Connection, cfg: BatchConfig = Batc
     if len(reps) < cfg.limit:
         got_ids = {p.photo_id for p in reps}
         filler = conn.execute(
-            f"SELECT {id_col} AS pid, {path_col} AS pth FROM {table} LIMIT ?",
-            (cfg.limit - len(reps),)
+            sql.filler, (cfg.limit - len(reps),)
         ).fetchall()
         for r in filler:
             if r["pid"] in got_ids:
                 continue
             reps.append(
-                PhotoItem(photo_id=r["pid"], path=r["pth"], phash=fetch_phash(conn, r["pid"])))
+                PhotoItem(photo_id=r["pid"], path=r["pth"], phash=r["ph"]))
             if len(reps) >= cfg.limit:
                 break
 
@@ -266,6 +463,53 @@ def build_simple_tagging_batch(conn: sqlite3.Connection, cfg: BatchConfig = Batc
     return reps
 
 
+# Longest edge (px) a preview is decoded at, even while the widget is still small
+_MIN_DECODE_EDGE = 1024
+# Decoded previews kept around for back-and-forth navigation
+_PIXMAP_CACHE_SIZE = 8
+
+
+def _decode_scaled(path: str, edge: float) -> Tuple[QImage, QSize]:
+    """
+    Decode so the longest side is at most `edge` px (JPEG scales in the DCT
+    domain via setScaledSize). Returns the image and the full-resolution size,
+    so absolute face coords still normalize correctly. Safe off the GUI thread.
+    """
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    src = reader.size()
+    factor = 1.0
+    if src.isValid() and src.width() > 0 and src.height() > 0:
+        factor = min(1.0, edge / max(src.width(), src.height()))
+        if factor < 1.0:
+            reader.setScaledSize(QSize(max(1, round(src.width() * factor)),
+                                       max(1, round(src.height() * factor))))
+    img = reader.read()
+    if img.isNull():
+        return QImage(), QSize(0, 0)
+    return img, QSize(round(img.width() / factor), round(img.height() / factor))
+
+
+class _PrefetchSignals(QObject):
+    ready = Signal(int, object, object)  # photo_id, QImage, full-res QSize
+
+
+class _PrefetchJob(QRunnable):
+    """Decodes neighbouring batch photos in the background (QImage only; QPixmap is GUI-thread)."""
+
+    def __init__(self, items: List[Tuple[int, str]], edge: float):
+        super().__init__()
+        self.signals = _PrefetchSignals()
+        self.items = items
+        self.edge = edge
+
+    def run(self):
+        for photo_id, path in self.items:
+            img, full_size = _decode_scaled(path, self.edge)
+            if not img.isNull():
+                self.signals.ready.emit(photo_id, img, full_size)
+
+
 # ---------- Overlay widget (faces with selectable rectangles + hover name) ----------
 
 class FacePreview(QWidget):
@@ -275,6 +519,15 @@ class FacePreview(QWidget):
     Shows assigned person name on hover.
     """
 
+    # built once; paintEvent only picks a reference per face
+    _PEN_SELECTED = QPen(QColor("#21ba45"), 3)    # green: selected
+    _PEN_ASSIGNED = QPen(QColor("#1f77b4"), 2)    # blue: has person
+    _PEN_UNASSIGNED = QPen(QColor("#d62728"), 2)  # red: unassigned
+    _PEN_LABEL = QPen(QColor("#000"), 1)
+    _PEN_EMPTY = QPen(QColor("#999"), 1)
+    _LABEL_BG = QColor(255, 255, 255, 210)
+    _Q16 = 65535.0  # full scale for the uint16 face boxes
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMinimumSize(QSize(320, 240))
@@ -283,6 +536,13 @@ class FacePreview(QWidget):
         self._pixmap: Optional[QPixmap] = None
         self._image_size = QSize(0, 0)
         self._faces: List[Dict] = []
+        # normalized face boxes as parallel arrays, quantized to 1/65535 of the image
+        self._fx = self._fy = self._fw = self._fh = np.empty(0, dtype=np.uint16)
+        self._fids = np.empty(0, dtype=np.int64)
+        # same boxes in widget pixels; rebuilt lazily when image, faces or size change
+        self._cached_draw_rect: Optional[QRectF] = None
+        self._cached_rects: List[QRectF] = []
+        self._px = self._py = self._pw = self._ph = np.empty(0, dtype=np.float32)
         self._people_lu: Dict[int, str] = {}
         self.selected: Set[int] = set()
         self.selection_changed = None
@@ -291,13 +551,22 @@ class FacePreview(QWidget):
     def set_person_lookup(self, lu: Dict[int, str]):
         self._people_lu = dict(lu or {})
 
-    def set_image(self, pm: Optional[QPixmap]):
+    def add_person_lookup(self, person_id: int, name: str):
+        self._people_lu[int(person_id)] = name
+
+    def set_image(self, pm: Optional[QPixmap], image_size: Optional[QSize] = None):
+        """`image_size` is the full-resolution size when `pm` was decoded downscaled."""
         self._pixmap = pm
-        self._image_size = pm.size() if pm else QSize(0, 0)
+        if image_size is not None and pm:
+            self._image_size = image_size
+        else:
+            self._image_size = pm.size() if pm else QSize(0, 0)
+        self._build_face_arrays()  # normalization depends on the image size
         self.update()
 
     def set_faces(self, faces: List[sqlite3.Row]):
         self._faces = [dict(r) for r in faces]
+        self._build_face_arrays()
         fids = {int(d["face_id"]) for d in self._faces}
         self.selected = {fid for fid in self.selected if fid in fids}
         if self.hover_fid not in fids:
@@ -306,6 +575,16 @@ class FacePreview(QWidget):
         if self.selection_changed:
             self.selection_changed(len(self.selected))
 
+    def update_face_fields(self, face_ids: Sequence[int], assigned_person_id: Optional[int] = None):
+        """Apply a known assignment change to the cached faces without re-querying the DB."""
+        ids = set(face_ids)
+        name = self._people_lu.get(assigned_person_id) if assigned_person_id is not None else None
+        for d in self._faces:
+            if int(d["face_id"]) in ids:
+                d["assigned_person_id"] = assigned_person_id
+                d["person_name"] = name
+        self.update()
+
     def clear_selection(self):
         self.selected.clear()
         self.update()
@@ -322,13 +601,16 @@ class FacePreview(QWidget):
         return sorted(self.selected)
 
     @staticmethod
-    def _load_pixmap_for_widget(path: str, widget: QWidget) -> QPixmap:
-        reader = QImageReader(path)
-        reader.setAutoTransform(True)
-        img = reader.read()
+    def _load_pixmap_for_widget(path: str, widget: QWidget) -> Tuple[QPixmap, QSize]:
+        """Decode `path` at roughly `widget`'s display size; see _decode_scaled."""
+        img, full_size = _decode_scaled(path, FacePreview._decode_edge(widget))
         if img.isNull():
-            return QPixmap()
-        return QPixmap.fromImage(img)
+            return QPixmap(), full_size
+        return QPixmap.fromImage(img), full_size
+
+    @staticmethod
+    def _decode_edge(widget: QWidget) -> float:
+        return max(widget.width(), widget.height(), _MIN_DECODE_EDGE) * widget.devicePixelRatioF()
 
     # --- geometry helpers (support normalized OR absolute pixel coords) ---
     def _as_normalized(self, x: float, y: float, w: float, h: float) -> Tuple[float, float, float, float]:
@@ -342,14 +624,6 @@ class FacePreview(QWidget):
             return x, y, w, h
         return x / iw, y / ih, w / iw, h / ih
 
-    def _rect_for_face(self, draw_rect: QRectF, d: Dict) -> QRectF:
-        x, y, w, h = float(d["x"]), float(d["y"]), float(d["w"]), float(d["h"])
-        xn, yn, wn, hn = self._as_normalized(x, y, w, h)
-        return QRectF(draw_rect.x() + xn * draw_rect.width(),
-                      draw_rect.y() + yn * draw_rect.height(),
-                      wn * draw_rect.width(),
-                      hn * draw_rect.height())
-
     def _compute_draw_rect(self) -> QRectF:
         if not self._pixmap:
             return QRectF(0, 0, self.width(), self.height())
@@ -367,27 +641,26 @@ class FacePreview(QWidget):
         p.fillRect(self.rect(), self.palette().window())
 
         if not self._pixmap or self._pixmap.isNull():
-            p.setPen(QPen(QColor("#999"), 1))
+            p.setPen(self._PEN_EMPTY)
             p.drawText(self.rect(), Qt.AlignCenter, "No photo")
             return
 
-        draw_rect = self._compute_draw_rect()
+        draw_rect = self._ensure_rects()
         p.setRenderHint(QPainter.SmoothPixmapTransform, True)
         src = QRectF(0, 0, self._pixmap.width(), self._pixmap.height())
         p.drawPixmap(draw_rect, self._pixmap, src)
 
         p.setRenderHint(QPainter.Antialiasing, True)
-        for d in self._faces:
-            r = self._rect_for_face(draw_rect, d)
+        for d, r in zip(self._faces, self._cached_rects):
             fid = int(d["face_id"])
             assigned = d.get("assigned_person_id") is not None
 
             if fid in self.selected:
-                pen = QPen(QColor("#21ba45"), 3)  # green: selected
+                pen = self._PEN_SELECTED
             elif assigned:
-                pen = QPen(QColor("#1f77b4"), 2)  # blue: has person
+                pen = self._PEN_ASSIGNED
             else:
-                pen = QPen(QColor("#d62728"), 2)  # red: unassigned
+                pen = self._PEN_UNASSIGNED
             p.setPen(pen)
             p.drawRect(r)
 
@@ -395,19 +668,46 @@ class FacePreview(QWidget):
             if self.hover_fid == fid and d.get("person_name"):
                 label = d["person_name"]
                 text_rect = QRectF(r.x(), r.y() - 20, max(60.0, r.width()), 18)
-                bg = QColor(255, 255, 255, 210)
-                p.fillRect(text_rect, bg)
-                p.setPen(QPen(QColor("#000"), 1))
+                p.fillRect(text_rect, self._LABEL_BG)
+                p.setPen(self._PEN_LABEL)
                 p.drawText(text_rect, Qt.AlignCenter, label)
 
+    def _build_face_arrays(self):
+        boxes = [self._as_normalized(float(d["x"]), float(d["y"]), float(d["w"]), float(d["h"]))
+                 for d in self._faces]
+        xywh = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        q = np.rint(np.clip(xywh, 0.0, 1.0) * self._Q16).astype(np.uint16)
+        self._fx, self._fy, self._fw, self._fh = q.T
+        self._fids = np.asarray([int(d["face_id"]) for d in self._faces], dtype=np.int64)
+        self._cached_draw_rect = None
+
+    def _ensure_rects(self) -> QRectF:
+        """Draw rect + per-face pixel rects, recomputed only after set_image/set_faces/resize."""
+        if self._cached_draw_rect is None:
+            dr = self._compute_draw_rect()
+            sx, sy = dr.width() / self._Q16, dr.height() / self._Q16
+            self._px = dr.x() + self._fx.astype(np.float32) * sx
+            self._py = dr.y() + self._fy.astype(np.float32) * sy
+            self._pw = self._fw.astype(np.float32) * sx
+            self._ph = self._fh.astype(np.float32) * sy
+            self._cached_rects = [QRectF(float(x), float(y), float(w), float(h))
+                                  for x, y, w, h in zip(self._px, self._py, self._pw, self._ph)]
+            self._cached_draw_rect = dr
+        return self._cached_draw_rect
+
+    def resizeEvent(self, e):
+        self._cached_draw_rect = None
+        super().resizeEvent(e)
+
     def _face_at(self, pt: QPointF) -> Optional[int]:
-        if not self._pixmap or self._pixmap.isNull():
+        if not self._pixmap or self._pixmap.isNull() or not self._fids.size:
             return None
-        dr = self._compute_draw_rect()
-        for d in reversed(self._faces):
-            if self._rect_for_face(dr, d).contains(pt):
-                return int(d["face_id"])
-        return None
+        self._ensure_rects()
+        x, y = pt.x(), pt.y()
+        mask = ((x >= self._px) & (x <= self._px + self._pw)
+                & (y >= self._py) & (y <= self._py + self._ph))
+        hits = self._fids[mask]
+        return int(hits[-1]) if hits.size else None  # topmost = last drawn
 
     def mouseMoveEvent(self, e):
         fid = self._face_at(e.position())
@@ -458,16 +758,155 @@ class FacePreview(QWidget):
             self.selection_changed(len(self.selected))
 
 
+# ---------- Background writes ----------
+
+class _WriteSignals(QObject):
+    done = Signal(int, object)  # photo_id, job-specific payload
+    failed = Signal(str)
+
+
+class _WriteJob(QRunnable):
+    """
+    One write transaction on the writer connection, off the GUI thread.
+    Runs write(conn, photo_id, *args); its return value is emitted as
+    done(photo_id, payload) after commit, failed(msg) after rollback.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, photo_id: int,
+                 write: Callable[..., object], *args):
+        super().__init__()
+        self.signals = _WriteSignals()
+        self.conn = conn
+        self.photo_id = photo_id
+        self.write = write
+        self.args = args
+
+    def run(self):
+        conn = self.conn
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            payload = self.write(conn, self.photo_id, *self.args)
+            conn.commit()
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.done.emit(self.photo_id, payload)
+
+
+def _write_save_date(conn: sqlite3.Connection, photo_id: int, iso_dt: str,
+                     phash: Optional[int]) -> List[int]:
+    """Replace the photo's date and, optionally, its phash duplicates'. Payload: duplicate ids."""
+    replace_date_tag(conn, photo_id, iso_dt, source="human", conf=1.0)
+    dupes: List[int] = []
+    if phash is not None:
+        dupes = photos_by_phash(conn, phash, max_dist=DUPE_MAX_DIST)
+        replace_date_tags(conn, dupes, iso_dt, source="propagated", conf=0.95)
+    return dupes
+
+
+def _write_apply_faces(conn: sqlite3.Connection, photo_id: int,
+                       face_ids: List[int], person_id: int) -> List[int]:
+    """Assign a person to faces, their clusters, and the matching photo tags. Payload: face_ids."""
+    qmarks, face_args = _in_shape(face_ids)
+    rows = conn.execute(
+        f"SELECT cluster_id FROM face_boxes WHERE photo_id=? AND face_id IN ({qmarks})",
+        (photo_id, *face_args)
+    ).fetchall()
+    cluster_ids = sorted({r[0] for r in rows if r[0]})
+
+    # assign in current photo
+    conn.execute(
+        f"UPDATE face_boxes SET assigned_person_id=? WHERE photo_id=? AND face_id IN ({qmarks})",
+        (person_id, photo_id, *face_args)
+    )
+
+    # ensure photo-level tag exists so it appears in the right panel
+    upsert_person_tag(conn, photo_id, person_id, source="face", conf=1.0)
+
+    if cluster_ids:
+        clusters_json = json.dumps(cluster_ids)
+        # also mark entire cluster with this person
+        conn.execute(
+            "UPDATE face_boxes SET assigned_person_id=? "
+            "WHERE cluster_id IN (SELECT value FROM json_each(?))",
+            (person_id, clusters_json)
+        )
+        # propagate person tag to any photo that has these clusters
+        conn.execute("""
+            INSERT INTO photo_tags(photo_id, tag_type, tag_value, source, confidence)
+            SELECT DISTINCT photo_id, 'person', ?, 'propagated_cluster', 0.90
+            FROM face_boxes
+            WHERE cluster_id IN (SELECT value FROM json_each(?))
+            ON CONFLICT(photo_id, tag_type, tag_value) DO NOTHING
+        """, (str(person_id), clusters_json))
+    return face_ids
+
+
+def _write_clear_faces(conn: sqlite3.Connection, photo_id: int,
+                       face_ids: List[int], person_ids: Set[int]) -> List[int]:
+    """Clear person assignments on faces and drop tags left stale. Payload: face_ids."""
+    fq, face_args = _in_shape(face_ids)
+    pq, person_args = _in_shape([str(p) for p in person_ids])
+
+    # clear assignments in current photo
+    conn.execute(
+        f"UPDATE face_boxes SET assigned_person_id=NULL WHERE photo_id=? AND face_id IN ({fq})",
+        (photo_id, *face_args)
+    )
+
+    # remove propagated_cluster tag in this photo for affected people
+    conn.execute(f"""
+        DELETE FROM photo_tags
+        WHERE photo_id=? AND tag_type='person' AND tag_value IN ({pq}) AND source='propagated_cluster'
+    """, (photo_id, *person_args))
+
+    # if no faces of that person remain in this photo, drop any person tag for them (regardless of source)
+    conn.execute(f"""
+        DELETE FROM photo_tags
+        WHERE photo_id=? AND tag_type='person' AND tag_value IN ({pq})
+          AND NOT EXISTS (
+            SELECT 1 FROM face_boxes fb
+            WHERE fb.photo_id=photo_tags.photo_id
+              AND fb.assigned_person_id=CAST(photo_tags.tag_value AS INTEGER)
+          )
+    """, (photo_id, *person_args))
+    return face_ids
+
+
 # ---------- UI ----------
 
 class TaggingPanel(QDockWidget):
+    _EMPTY = "— none —"
+    _SPAN_OPEN = "<span style='color:#777'>"
+    _SPAN_CLOSE = "</span>"
+
+    # defaults for handlers that fire while _init_ui is still running
+    batch: Sequence[PhotoItem] = ()
+    index: int = -1
+
     def __init__(self, db, parent=None):
         super().__init__("Tagging", parent)
-        self.conn = _open_conn(db)
+        self.conn = open_conn(db)
         _ensure_core_tables(self.conn)
 
+        # single writer thread: commits never block the event loop, and stay serialized
+        self._wconn = _open_writer_conn(self.conn)
+        self._db_pool = QThreadPool(self)
+        self._db_pool.setMaxThreadCount(1)
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self._close_db)
+        # read-only connections so tag refreshes don't wait on the writer
+        self._read_pool = _open_reader_pool(self.conn)
+
         self.batch: List[PhotoItem] = []
         self.index: int = -1
+        # lowercased names in peopleBox order, so an added person is inserted in place
+        self._people_keys: List[str] = []
+        # photo_id -> (preview pixmap, full-res size), least recently shown first
+        self._pm_cache: OrderedDict[int, Tuple[QPixmap, QSize]] = OrderedDict()
 
         self._init_ui()
         self._load_people()
@@ -541,7 +980,7 @@ class TaggingPanel(QDockWidget):
         rightLay.addLayout(dateRow)
 
         rightLay.addSpacing(8)
-        self.applyToDupes = QCheckBox("Also apply to duplicates (same phash)")
+        self.applyToDupes = QCheckBox("Also apply to duplicates (near-identical phash)")
         self.applyToDupes.setChecked(True)
         rightLay.addWidget(self.applyToDupes)
 
@@ -557,10 +996,10 @@ class TaggingPanel(QDockWidget):
         rightLay.addSpacing(12)
         gb = QGroupBox("Existing Tags (this photo)")
         gbLay = QVBoxLayout(gb)
-        self.tagsPeopleLbl = QLabel("— none —")
+        self.tagsPeopleLbl = QLabel(self._EMPTY)
         self.tagsPeopleLbl.setWordWrap(True)
         self.tagsPeopleLbl.setTextFormat(Qt.RichText)
-        self.tagsDateLbl = QLabel("— none —")
+        self.tagsDateLbl = QLabel(self._EMPTY)
         self.tagsDateLbl.setWordWrap(True)
         self.tagsDateLbl.setTextFormat(Qt.RichText)
         gbLay.addWidget(QLabel("People:"))
@@ -596,6 +1035,12 @@ class TaggingPanel(QDockWidget):
         self._date_autosave.setInterval(600)
         self._date_autosave.timeout.connect(self._autosave_date_if_complete)
 
+        # Coalesce bursts of tag refreshes (fast Prev/Next, repeated saves)
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(50)
+        self._refresh_timer.timeout.connect(self._refresh_tags_impl)
+
         # Signals
         self.buildBtn.clicked.connect(self._build_batch)
         self.prevBtn.clicked.connect(self._prev)
@@ -616,8 +1061,17 @@ class TaggingPanel(QDockWidget):
         for row in people:
             self.peopleBox.addItem(row["display_name"], row["person_id"])
             lu[int(row["person_id"])] = row["display_name"]
+        self._people_keys = [row["display_name"].lower() for row in people]
         self.preview.set_person_lookup(lu)
 
+    def _insert_person(self, person_id: int, name: str) -> int:
+        """Add one person to the combo/lookup without re-reading the table; returns its index."""
+        idx = bisect.bisect_right(self._people_keys, name.lower())
+        self._people_keys.insert(idx, name.lower())
+        self.peopleBox.insertItem(idx, name, person_id)
+        self.preview.add_person_lookup(person_id, name)
+        return idx
+
     def _build_batch(self):
         try:
             self.batch = build_simple_tagging_batch(self.conn)
@@ -631,8 +1085,6 @@ class TaggingPanel(QDockWidget):
     # ----- Navigation & Preview -----
 
     def _current(self) -> Optional[PhotoItem]:
-        if not hasattr(self, "index"):
-            self.index = -1
         if 0 <= self.index < len(self.batch):
             return self.batch[self.index]
         return None
@@ -652,8 +1104,8 @@ class TaggingPanel(QDockWidget):
             self.nextBtn.setEnabled(False)
             self.applyPersonFaceBtn.setEnabled(False)
             self.clearPersonFaceBtn.setEnabled(False)
-            self.tagsPeopleLbl.setText("— none —")
-            self.tagsDateLbl.setText("— none —")
+            self.tagsPeopleLbl.setText(self._EMPTY)
+            self.tagsDateLbl.setText(self._EMPTY)
             self.selCountLbl.setText("Selected faces: 0")
             return
 
@@ -665,16 +1117,52 @@ class TaggingPanel(QDockWidget):
 
         self.pathLbl.setText(cur.path)
         pth = _norm_path(cur.path)
-        pm = FacePreview._load_pixmap_for_widget(pth, self.preview)
-        self.preview.set_image(None if pm.isNull() else pm)
+        cached = self._pm_cache.get(cur.photo_id)
+        if cached is not None:
+            self._pm_cache.move_to_end(cur.photo_id)
+            pm, full_size = cached
+        else:
+            pm, full_size = FacePreview._load_pixmap_for_widget(pth, self.preview)
+            if not pm.isNull():
+                self._cache_pixmap(cur.photo_id, pm, full_size)
+        self.preview.set_image(None if pm.isNull() else pm, full_size)
 
-        faces = fetch_faces_for_photo(self.conn, cur.photo_id)
+        with self._reader() as rconn:
+            faces, people, dates = fetch_photo_bundle(rconn, cur.photo_id)
         self.preview.set_faces(faces)
         self.selCountLbl.setText(
             f"Selected faces: {len(self.preview.selected)}")
 
-        self._refresh_tags()
+        # tags are already fresh; drop any refresh queued for the previous photo
+        self._refresh_timer.stop()
+        self._show_tags(people, dates)
         self.statusLbl.setText("")
+        self._prefetch_neighbors()
+
+    def _cache_pixmap(self, photo_id: int, pm: QPixmap, full_size: QSize):
+        self._pm_cache[photo_id] = (pm, full_size)
+        self._pm_cache.move_to_end(photo_id)
+        while len(self._pm_cache) > _PIXMAP_CACHE_SIZE:
+            self._pm_cache.popitem(last=False)
+
+    def _prefetch_neighbors(self):
+        n = len(self.batch)
+        if n < 2:
+            return
+        todo = []
+        for j in {(self.index + 1) % n, (self.index - 1) % n}:
+            item = self.batch[j]
+            if item.photo_id not in self._pm_cache:
+                todo.append((item.photo_id, _norm_path(item.path)))
+        if not todo:
+            return
+        job = _PrefetchJob(todo, FacePreview._decode_edge(self.preview))
+        job.signals.ready.connect(self._on_prefetched)
+        QThreadPool.globalInstance().start(job)
+
+    def _on_prefetched(self, photo_id: int, img: QImage, full_size: QSize):
+        if photo_id not in self._pm_cache:
+            self._cache_pixmap(photo_id, QPixmap.fromImage(img), full_size)
 
     def resizeEvent(self, event):
         self.preview.update()
@@ -731,24 +1219,11 @@ class TaggingPanel(QDockWidget):
         cur = self._current()
         if not cur:
             return
-        dupes: List[int] = []
-        try:
-            replace_date_tag(self.conn, cur.photo_id, iso_dt,
-                             source="human", conf=1.0)
-            if self.applyToDupes.isChecked() and cur.phash:
-                dupes = photos_by_phash(self.conn, cur.phash)
-                for pid in dupes:
-                    replace_date_tag(self.conn, pid, iso_dt,
-                                     source="propagated", conf=0.95)
-            self.conn.commit()
-        except Exception as e:
-            QMessageBox.critical(
-                self, "Date Save", f"Failed to save date:\n{e}")
-            return
-
-        self._refresh_tags()
-        self.statusLbl.setText(
-            f"Saved date (replaced previous); also set {len(dupes)} duplicate(s).")
+        phash = cur.phash if self.applyToDupes.isChecked() else None
+        job = _WriteJob(self._wconn, cur.photo_id, _write_save_date, iso_dt, phash)
+        job.signals.done.connect(self._on_date_saved)
+        job.signals.failed.connect(self._on_date_failed)
+        self._run_write(job)
 
     # ----- Actions -----
 
@@ -763,10 +1238,7 @@ class TaggingPanel(QDockWidget):
                                  f"Failed to add person:\n{e}")
             return
         self.newPerson.clear()
-        self._load_people()
-        idx = self.peopleBox.findData(pid)
-        if idx >= 0:
-            self.peopleBox.setCurrentIndex(idx)
+        self.peopleBox.setCurrentIndex(self._insert_person(pid, name))
 
     def _apply_person_faces(self):
         cur = self._current()
@@ -783,53 +1255,10 @@ class TaggingPanel(QDockWidget):
             return
         person_id = int(self.peopleBox.currentData())
 
-        qmarks = ",".join(["?"] * len(face_ids))
-        rows = self.conn.execute(
-            f"SELECT face_id, cluster_id FROM face_boxes WHERE photo_id=? AND face_id IN ({qmarks})",
-            (cur.photo_id, *face_ids)
-        ).fetchall()
-        cluster_ids = sorted({r["cluster_id"]
-                             for r in rows if r["cluster_id"]})
-
-        try:
-            # assign in current photo
-            self.conn.execute(
-                f"UPDATE face_boxes SET assigned_person_id=? WHERE photo_id=? AND face_id IN ({qmarks})",
-                (person_id, cur.photo_id, *face_ids)
-            )
-
-            # ensure photo-level tag exists so it appears in the right panel
-            upsert_person_tag(self.conn, cur.photo_id,
-                              person_id, source="face", conf=1.0)
-
-            # also mark entire cluster with this person
-            for cid in cluster_ids:
-                self.conn.execute("UPDATE face_boxes SET assigned_person_id=? WHERE cluster_id=?",
-                                  (person_id, cid))
-
-            # propagate person tag to any photo that has these clusters
-            if cluster_ids:
-                rows2 = self.conn.execute(
-                    f"SELECT DISTINCT photo_id FROM face_boxes WHERE cluster_id IN ({','.join('?'*len(cluster_ids))})",
-                    cluster_ids
-                ).fetchall()
-                target_ids = {int(r["photo_id"]) for r in rows2}
-                for pid2 in target_ids:
-                    self.conn.execute("""
-                        INSERT INTO photo_tags(photo_id, tag_type, tag_value, source, confidence)
-                        VALUES (?, 'person', ?, 'propagated_cluster', 0.90)
-                        ON CONFLICT(photo_id, tag_type, tag_value) DO NOTHING
-                    """, (pid2, str(person_id)))
-
-            self.conn.commit()
-        except Exception as e:
-            QMessageBox.critical(self, "Apply Person to Faces",
-                                 f"Failed to write tags:\n{e}")
-            return
-
-        self._refresh_tags()
-        self.preview.set_faces(fetch_faces_for_photo(self.conn, cur.photo_id))
-        self.statusLbl.setText(f"Saved person to {len(face_ids)} face(s).")
+        job = _WriteJob(self._wconn, cur.photo_id, _write_apply_faces, face_ids, person_id)
+        job.signals.done.connect(self._on_faces_applied)
+        job.signals.failed.connect(self._on_apply_failed)
+        self._run_write(job)
 
     def _clear_person_faces(self):
         """Remove assigned_person_id from selected faces; also drop stale photo-level tags when no faces remain."""
@@ -842,73 +1271,123 @@ class TaggingPanel(QDockWidget):
                 self, "Remove Person", "Select one or more face rectangles first.")
             return
 
-        qmarks = ",".join(["?"] * len(face_ids))
-        rows = self.conn.execute(
-            f"SELECT face_id, assigned_person_id FROM face_boxes WHERE photo_id=? AND face_id IN ({qmarks})",
-            (cur.photo_id, *face_ids)
-        ).fetchall()
-        person_ids = sorted({r["assigned_person_id"]
-                            for r in rows if r["assigned_person_id"] is not None})
+        qmarks, face_args = _in_shape(face_ids)
+        assigned = self.conn.execute(
+            f"SELECT assigned_person_id FROM face_boxes WHERE photo_id=? AND face_id IN ({qmarks}) "
+            "AND assigned_person_id IS NOT NULL",
+            (cur.photo_id, *face_args)
+        )
+        person_ids = {pid for (pid,) in assigned}
+        if not person_ids:
+            self.statusLbl.setText("No person assignments to clear.")
+            return
 
+        job = _WriteJob(self._wconn, cur.photo_id, _write_clear_faces, face_ids, person_ids)
+        job.signals.done.connect(self._on_faces_cleared)
+        job.signals.failed.connect(self._on_clear_failed)
+        self._run_write(job)
+
+    @contextmanager
+    def _reader(self):
+        """Borrow a pooled read-only connection (falls back to self.conn)."""
+        if self._read_pool is None:
+            yield self.conn
+            return
+        rconn = self._read_pool.get()
         try:
-            # clear assignments in current photo
-            self.conn.execute(
-                f"UPDATE face_boxes SET assigned_person_id=NULL WHERE photo_id=? AND face_id IN ({qmarks})",
-                (cur.photo_id, *face_ids)
-            )
+            yield rconn
+        finally:
+            self._read_pool.put(rconn)
+
+    def _close_db(self):
+        """
+        Let queued writes finish, then close the writer and the pooled readers;
+        anything after that runs on self.conn, as for an in-memory DB.
+        """
+        self._db_pool.waitForDone()
+        if self._wconn is not self.conn:
+            self._wconn.close()
+            self._wconn = self.conn
+        pool, self._read_pool = self._read_pool, None
+        while pool is not None and not pool.empty():
+            pool.get_nowait().close()
+
+    def _run_write(self, job: QRunnable):
+        if self._wconn is self.conn:
+            job.run()
+        else:
+            self._db_pool.start(job)
 
-            # remove propagated_cluster tag in this photo for affected people
-            for pid in person_ids:
-                self.conn.execute("""
-                    DELETE FROM photo_tags
-                    WHERE photo_id=? AND tag_type='person' AND tag_value=? AND source='propagated_cluster'
-                """, (cur.photo_id, str(pid)))
-
-            # if no faces of that person remain in this photo, drop any person tag for them (regardless of source)
-            for pid in person_ids:
-                row = self.conn.execute(
-                    "SELECT COUNT(*) AS c FROM face_boxes WHERE photo_id=? AND assigned_person_id=?",
-                    (cur.photo_id, pid)
-                ).fetchone()
-                if row and int(row["c"]) == 0:
-                    self.conn.execute(
-                        "DELETE FROM photo_tags WHERE photo_id=? AND tag_type='person' AND tag_value=?",
-                        (cur.photo_id, str(pid))
-                    )
-
-            self.conn.commit()
-        except Exception as e:
-            QMessageBox.critical(self, "Remove Person",
-                                 f"Failed to clear tags:\n{e}")
+    def _on_date_saved(self, photo_id: int, dupes: List[int]):
+        cur = self._current()
+        if cur and cur.photo_id == photo_id:
+            self._refresh_tags()
+        self.statusLbl.setText(
+            f"Saved date (replaced previous); also set {len(dupes)} duplicate(s).")
+
+    def _on_date_failed(self, msg: str):
+        QMessageBox.critical(
+            self, "Date Save", f"Failed to save date:\n{msg}")
+
+    def _on_faces_applied(self, photo_id: int, face_ids: List[int]):
+        cur = self._current()
+        if not cur or cur.photo_id != photo_id:
             return
+        self._refresh_tags()
+        # cluster propagation may have touched other faces here too; reload them all
+        self.preview.set_faces(fetch_faces_for_photo(self.conn, photo_id))
+        self.statusLbl.setText(f"Saved person to {len(face_ids)} face(s).")
+
+    def _on_apply_failed(self, msg: str):
+        QMessageBox.critical(self, "Apply Person to Faces",
+                             f"Failed to write tags:\n{msg}")
 
+    def _on_faces_cleared(self, photo_id: int, face_ids: List[int]):
+        cur = self._current()
+        if not cur or cur.photo_id != photo_id:
+            return  # user navigated away; the next _update_ui reloads from DB
         self._refresh_tags()
-        self.preview.set_faces(fetch_faces_for_photo(self.conn, cur.photo_id))
+        self.preview.update_face_fields(face_ids, assigned_person_id=None)
         self.statusLbl.setText(f"Removed person from {len(face_ids)} face(s).")
 
+    def _on_clear_failed(self, msg: str):
+        cur = self._current()
+        if cur:
+            # state is uncertain after a failed write; resync the overlay from the DB
+            self.preview.set_faces(fetch_faces_for_photo(self.conn, cur.photo_id))
+        QMessageBox.critical(self, "Remove Person",
+                             f"Failed to clear tags:\n{msg}")
+
     def _refresh_tags(self):
+        self._refresh_timer.start()
+
+    def _refresh_tags_impl(self):
         cur = self._current()
         if not cur:
-            self.tagsPeopleLbl.setText("— none —")
-            self.tagsDateLbl.setText("— none —")
+            self.tagsPeopleLbl.setText(self._EMPTY)
+            self.tagsDateLbl.setText(self._EMPTY)
             return
 
-        people, dates = fetch_tags_for_photo(self.conn, cur.photo_id)
+        with self._reader() as rconn:
+            people, dates = fetch_tags_for_photo(rconn, cur.photo_id)
+        self._show_tags(people, dates)
 
+    def _show_tags(self, people: List[sqlite3.Row], dates: List[sqlite3.Row]):
+        so, sc = self._SPAN_OPEN, self._SPAN_CLOSE
         if people:
             self.tagsPeopleLbl.setText(
-                " • " + "<br> • ".join(
-                    f"{r['display_name']} <span style='color:#777'>({r['source']}, {r['confidence']:.2f})</span>"
+                " • " + "<br> • ".join([
+                    f"{r['display_name']} {so}({r['source']}, {r['confidence']:.2f}){sc}"
                     for r in people
-                )
+                ])
             )
         else:
-            self.tagsPeopleLbl.setText("— none —")
+            self.tagsPeopleLbl.setText(self._EMPTY)
 
         if dates:
             latest = dates[0]  # newest first
             self.tagsDateLbl.setText(
-                f"{latest['iso_dt']} <span style='color:#777'>({latest['source']}, {latest['confidence']:.2f})</span>"
+                f"{latest['iso_dt']} {so}({latest['source']}, {latest['confidence']:.2f}){sc}"
             )
         else:
-            self.tagsDateLbl.setText("— none —")
+            self.tagsDateLbl.setText(self._EMPTY)
@@ -1,18 +1,83 @@
 # app/utils/db.py
 import sqlite3, os, threading
-from typing import List, Dict, Any
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Sequence, Tuple
 
 
 class DB:
     def __init__(self, db_path: str):
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        # allow use across threads; we’ll protect writes with a lock
+        self.db_path = db_path
+        # the writer: shared across threads, writes protected with a lock
         self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
-        self.lock = threading.Lock()
-        # better concurrency
+        # re-entrant so the single-row writers below also work inside transaction()
+        self.lock = threading.RLock()
+        self._txn_depth = 0
+        # better concurrency; NORMAL is durable under WAL and skips the per-commit fsync
         self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn.execute("PRAGMA synchronous=NORMAL;")
+        self.conn.execute("PRAGMA temp_store=MEMORY;")
+        self.conn.execute("PRAGMA mmap_size=268435456;")
+        self.conn.execute("PRAGMA cache_size=-65536;")
+        self.conn.execute("PRAGMA busy_timeout=30000;")
         self._init()
+        # readers: one read-only connection per thread, never behind self.lock;
+        # all of them are also listed here so close() can reach them
+        self._local = threading.local()
+        self._ro_uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._ro_uri, uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA busy_timeout=30000;")
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def close(self):
+        """Close the writer (after any open transaction) and every reader opened so far."""
+        with self.lock:
+            self.conn.close()
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group writes into one commit. Writer methods called inside skip their
+        own commit; nested use joins the outer transaction.
+        """
+        with self.lock:
+            if self._txn_depth:
+                self._txn_depth += 1
+                try:
+                    yield self.conn
+                finally:
+                    self._txn_depth -= 1
+                return
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._txn_depth = 1
+            try:
+                yield self.conn
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+            finally:
+                self._txn_depth = 0
+
+    def _commit(self):
+        if not self._txn_depth:
+            self.conn.commit()
 
     def _init(self):
         with self.lock:
@@ -28,29 +93,55 @@ class DB:
                 enhanced_path TEXT
             )"""
             )
+            # path lookups already use the UNIQUE index; this one serves date ordering/filters
+            c.execute("CREATE INDEX IF NOT EXISTS idx_photos_inferred ON photos(inferred_date)")
             self.conn.commit()
 
-    def insert_photo_if_absent(self, path: str):
-        fs_date = None
+    def analyze(self):
+        """Refresh planner statistics; call after bulk inserts."""
+        with self.lock:
+            self.conn.execute("ANALYZE")
+            self._commit()
+
+    @staticmethod
+    def _fs_date(path: str) -> str | None:
         try:
-            fs_date = str(int(os.path.getmtime(path)))
+            return str(int(os.path.getmtime(path)))
         except Exception:
-            pass
+            return None
+
+    def insert_photo_if_absent(self, path: str):
+        self.insert_photos_if_absent([path])
+
+    def insert_photos_if_absent(self, paths: Sequence[str]):
+        self.insert_photos_bulk([(p, self._fs_date(p)) for p in paths])  # stat outside the lock
+
+    def insert_photos_bulk(self, rows: Sequence[Tuple[str, str | None]]):
+        """(path, fs_date) pairs, for callers that already have the mtime from a scan."""
         with self.lock:
-            self.conn.execute(
-                "INSERT OR IGNORE INTO photos(path, fs_date) VALUES(?,?)",
-                (path, fs_date),
-            )
-            self.conn.commit()
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO photos(path, fs_date) VALUES(?,?)", rows)
+            self._commit()
+
+    # only the columns list callers read; one fixed string, so it stays in the statement cache
+    _LIST_SQL = "SELECT id, path, inferred_date, confidence FROM photos ORDER BY id DESC LIMIT ?"
 
     def list_photos(self, limit: int = 1000) -> List[Dict[str, Any]]:
-        cur = self.conn.execute("SELECT * FROM photos LIMIT ?", (limit,))
+        cur = self._reader().execute(self._LIST_SQL, (limit,))
         return cur.fetchall()
 
     def update_exif_date(self, photo_id: int, exif_date: str | None):
         with self.lock:
             self.conn.execute("UPDATE photos SET exif_date=? WHERE id=?", (exif_date, photo_id))
-            self.conn.commit()
+            self._commit()
+
+    def update_exif_dates_by_path(self, pairs: Iterable[Tuple[str, str]]):
+        """(path, exif_date) pairs; saves a find_by_path round-trip per photo."""
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE photos SET exif_date=? WHERE path=?",
+                [(exif_date, path) for path, exif_date in pairs])
+            self._commit()
 
     def update_inferred(self, photo_id: int, date_str: str, conf: float):
         with self.lock:
@@ -58,16 +149,16 @@ class DB:
                 "UPDATE photos SET inferred_date=?, confidence=? WHERE id=?",
                 (date_str, conf, photo_id),
             )
-            self.conn.commit()
+            self._commit()
 
     def set_enhanced_path(self, photo_id: int, out_path: str | None):
         with self.lock:
             self.conn.execute("UPDATE photos SET enhanced_path=? WHERE id=?", (out_path, photo_id))
-            self.conn.commit()
+            self._commit()
 
     def iter_all(self):
-        return self.conn.execute("SELECT * FROM photos")
+        return self._reader().execute("SELECT * FROM photos")
 
     def find_by_path(self, path: str):
-        cur = self.conn.execute("SELECT * FROM photos WHERE path=?", (path,))
+        cur = self._reader().execute("SELECT * FROM photos WHERE path=?", (path,))
         return cur.fetchone()
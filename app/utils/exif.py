@@ -1,49 +1,183 @@
-import subprocess, shutil, os, tempfile, textwrap
+import subprocess, shutil, os, tempfile, textwrap, threading, atexit, re, string
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from xml.sax.saxutils import escape
 
 
+@lru_cache(maxsize=1)
 def have_exiftool() -> bool:
     return shutil.which("exiftool") is not None
 
 
+class ExifToolDaemon:
+    """
+    One long-lived `exiftool -stay_open` process fed through stdin, so bulk
+    writes pay the Perl startup once. Commands are serialized by a lock; a
+    dead process is restarted on the next call.
+    """
+
+    def __init__(self):
+        self._proc: subprocess.Popen | None = None
+        self._lock = threading.Lock()
+        self._seq = 0
+
+    def _start(self):
+        self._proc = subprocess.Popen(
+            ["exiftool", "-stay_open", "True", "-@", "-",
+             "-common_args", "-overwrite_original", "-charset", "filename=utf8"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, encoding="utf-8", errors="replace",
+        )
+
+    def execute(self, *args: str) -> str:
+        """Run one exiftool command; returns its combined stdout/stderr. Raises OSError if it can't."""
+        with self._lock:
+            for attempt in range(2):
+                if self._proc is None or self._proc.poll() is not None:
+                    self._start()
+                self._seq += 1
+                sentinel = f"{{ready{self._seq}}}"
+                try:
+                    self._proc.stdin.write("\n".join(args) + f"\n-execute{self._seq}\n")
+                    self._proc.stdin.flush()
+                    out = []
+                    for line in self._proc.stdout:
+                        if line.strip() == sentinel:
+                            return "".join(out)
+                        out.append(line)
+                    raise BrokenPipeError("exiftool exited")
+                except OSError:
+                    self._proc = None
+                    if attempt:
+                        raise
+        raise OSError("exiftool unavailable")
+
+    def close(self):
+        with self._lock:
+            if self._proc and self._proc.poll() is None:
+                try:
+                    self._proc.stdin.write("-stay_open\nFalse\n")
+                    self._proc.stdin.flush()
+                    self._proc.wait(timeout=5)
+                except (OSError, subprocess.TimeoutExpired):
+                    self._proc.kill()
+            self._proc = None
+
+
+_daemon = ExifToolDaemon()
+atexit.register(_daemon.close)
+
+# "N image files updated" / "N image files unchanged" both mean the value is in place
+_WRITTEN_RE = re.compile(r"(\d+) image files? (?:updated|unchanged)")
+_FAILED_RE = re.compile(r"files? weren't updated|^Error:", re.MULTILINE)
+
+# (path, mtime_ns, size) -> date last written, so rewriting the same value is a no-op
+_WRITTEN_CACHE_SIZE = 4096
+_written: OrderedDict[tuple, str] = OrderedDict()
+
+
+def _file_key(path: str) -> tuple | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+def _remember_written(path: str, dt: str):
+    key = _file_key(path)
+    if key is None:
+        return
+    _written[key] = dt
+    _written.move_to_end(key)
+    while len(_written) > _WRITTEN_CACHE_SIZE:
+        _written.popitem(last=False)
+
+
+def _written_count(output: str) -> int:
+    """Files exiftool left holding the requested value (updated or already unchanged)."""
+    return sum(int(n) for n in _WRITTEN_RE.findall(output))
+
+
+def _spawn_exiftool(args: list[str]) -> bool:
+    try:
+        subprocess.run(["exiftool", "-overwrite_original", *args],
+                       check=True, capture_output=True)
+        return True
+    except subprocess.CalledProcessError as e:
+        print("ExifTool error:", e.stderr.decode("utf-8", "ignore"))
+        return False
+
+
 def write_exif_datetime(path: str, dt: str) -> bool:
     """Write EXIF DateTimeOriginal and XMP:DateCreated via exiftool.
     dt format e.g. '1997:08:01 12:00:00'.
     """
     if not have_exiftool():
         return False
-    cmd = [
-        "exiftool",
-        "-overwrite_original",
-        f"-EXIF:DateTimeOriginal={dt}",
-        f"-XMP:DateCreated={dt}",
-        path,
-    ]
+    key = _file_key(path)
+    if key is not None and _written.get(key) == dt:
+        return True  # unchanged since we wrote this value
+    args = [f"-EXIF:DateTimeOriginal={dt}", f"-XMP:DateCreated={dt}", path]
     try:
-        subprocess.run(cmd, check=True, capture_output=True)
-        return True
-    except subprocess.CalledProcessError as e:
-        print("ExifTool error:", e.stderr.decode("utf-8", "ignore"))
-        return False
+        out = _daemon.execute(*args)
+        ok = _written_count(out) > 0 and not _FAILED_RE.search(out)
+        if not ok:
+            print("ExifTool error:", out.strip())
+    except OSError:
+        ok = _spawn_exiftool(args)  # daemon won't start; fall back to one-shot
+    if ok:
+        _remember_written(path, dt)
+    return ok
 
 
-def write_xmp_people_sidecar(path: str, people: list[str]) -> bool:
-    """Create a minimal .xmp sidecar with PersonInImage entries."""
-    xmp_path = path + ".xmp"
-    persons = "".join([f"<rdf:li>{p}</rdf:li>" for p in people])
-    xml = f"""<?xpacket begin='﻿' id='W5M0MpCehiHzreSzNTczkc9d'?>
+def write_exif_datetime_many(paths: list[str], dt: str) -> int:
+    """Same as write_exif_datetime for many files in one exiftool command; returns files now holding `dt`."""
+    if not have_exiftool():
+        return 0
+    todo = [p for p in paths if _written.get(_file_key(p)) != dt]
+    if not todo:
+        return len(paths)
+    args = [f"-EXIF:DateTimeOriginal={dt}", f"-XMP:DateCreated={dt}", *todo]
+    try:
+        out = _daemon.execute(*args)
+        updated = _written_count(out)
+        if _FAILED_RE.search(out):
+            updated = min(updated, len(todo) - 1)  # some file failed; don't cache any
+        if updated < len(todo):
+            print("ExifTool error:", out.strip())
+    except OSError:
+        updated = len(todo) if _spawn_exiftool(args) else 0
+    if updated == len(todo):
+        for p in todo:
+            _remember_written(p, dt)
+    return updated + len(paths) - len(todo)
+
+
+_XMP_TMPL = string.Template("""<?xpacket begin='﻿' id='W5M0MpCehiHzreSzNTczkc9d'?>
 <x:xmpmeta xmlns:x='adobe:ns:meta/' x:xmptk='PhotoChrono'>
  <rdf:RDF xmlns:rdf='http://www.w3.org/1999/02/22-rdf-syntax-ns#'>
   <rdf:Description xmlns:dc='http://purl.org/dc/elements/1.1/' xmlns:MP='http://ns.microsoft.com/photo/1.2/' xmlns:xmp='http://ns.adobe.com/xap/1.0/'>
    <MP:PersonInImage>
     <rdf:Bag>
-     {persons}
+     $persons
     </rdf:Bag>
    </MP:PersonInImage>
   </rdf:Description>
  </rdf:RDF>
 </x:xmpmeta>
 <?xpacket end='w'?>
-"""
-    with open(xmp_path, "w", encoding="utf-8") as f:
-        f.write(xml)
+""")
+
+
+def write_xmp_people_sidecar(path: str, people: list[str]) -> bool:
+    """Create a minimal .xmp sidecar with PersonInImage entries."""
+    xmp_path = path + ".xmp"
+    persons = "".join([f"<rdf:li>{escape(p)}</rdf:li>" for p in people])
+    key = _file_key(xmp_path)
+    if key is not None and _written.get(key) == persons:
+        return True  # sidecar untouched since we wrote these names
+    Path(xmp_path).write_text(_XMP_TMPL.substitute(persons=persons), encoding="utf-8")
+    _remember_written(xmp_path, persons)
     return True
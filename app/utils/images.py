@@ -5,21 +5,16 @@ def unsharp_mask(image, ksize=(5, 5), sigma=1.0, amount=1.0, threshold=0):
     blurred = cv2.GaussianBlur(image, ksize, sigma)
     sharpened = cv2.addWeighted(image, 1 + amount, blurred, -amount, 0)
     if threshold > 0:
-        low_contrast_mask = np.absolute(image - blurred) < threshold
-        np.copyto(sharpened, image, where=low_contrast_mask)
+        # absdiff saturates in uint8; image - blurred would wrap before the abs
+        low_contrast_mask = cv2.compare(cv2.absdiff(image, blurred), threshold, cv2.CMP_LT)
+        cv2.copyTo(image, low_contrast_mask, sharpened)
     return sharpened
 
 
 def auto_white_balance(img):
-    # Simple gray-world assumption
-    result = img.copy().astype(np.float32)
-    avg_b, avg_g, avg_r = (
-        np.mean(result[:, :, 0]),
-        np.mean(result[:, :, 1]),
-        np.mean(result[:, :, 2]),
-    )
-    avg = (avg_b + avg_g + avg_r) / 3.0
-    result[:, :, 0] *= avg / (avg_b + 1e-6)
-    result[:, :, 1] *= avg / (avg_g + 1e-6)
-    result[:, :, 2] *= avg / (avg_r + 1e-6)
-    return np.clip(result, 0, 255).astype(np.uint8)
+    # Simple gray-world assumption; gains applied as a per-channel uint8 LUT (one pass, no float copy)
+    means = cv2.mean(img)[:3]
+    avg = sum(means) / 3.0
+    ramp = np.arange(256, dtype=np.float32)
+    lut = np.stack([np.clip(ramp * np.float32(avg / (m + 1e-6)), 0, 255) for m in means], axis=-1)
+    return cv2.LUT(img, lut.astype(np.uint8).reshape(256, 1, 3))
@@ -0,0 +1,69 @@
+# app/utils/phash.py
+from __future__ import annotations
+
+import numpy as np
+
+# Optional: numba compiles the scan to a parallel loop (LLVM turns the SWAR sum into POPCNT)
+try:
+    import numba  # type: ignore
+except Exception:
+    numba = None
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+_S1, _S2, _S4, _S56 = np.uint64(1), np.uint64(2), np.uint64(4), np.uint64(56)
+
+
+def _popcount64(x):
+    """Set bits per uint64 (SWAR); works on scalars and arrays alike."""
+    x = x - ((x >> _S1) & _M1)
+    x = (x & _M2) + ((x >> _S2) & _M2)
+    x = (x + (x >> _S4)) & _M4
+    return (x * _H01) >> _S56
+
+
+def _within_py(query, hashes, max_dist):
+    # same SWAR steps as _popcount64, in place on two scratch arrays instead of ~10 temporaries
+    x = np.bitwise_xor(hashes, query)
+    t = np.empty_like(x)
+    np.right_shift(x, _S1, out=t)
+    t &= _M1
+    x -= t
+    np.right_shift(x, _S2, out=t)
+    t &= _M2
+    x &= _M2
+    x += t
+    np.right_shift(x, _S4, out=t)
+    x += t
+    x &= _M4
+    x *= _H01
+    x >>= _S56
+    return x <= np.uint64(max_dist)
+
+
+if numba is not None:
+    _popcount64 = numba.njit(cache=True)(_popcount64)
+
+    @numba.njit(parallel=True, cache=True)
+    def _within(query, hashes, max_dist):
+        out = np.empty(hashes.size, dtype=np.bool_)
+        limit = np.uint64(max_dist)
+        for i in numba.prange(hashes.size):
+            out[i] = _popcount64(hashes[i] ^ query) <= limit
+        return out
+else:
+    _within = _within_py
+
+
+def hamming_within(query: int, hashes: np.ndarray, max_dist: int) -> np.ndarray:
+    """
+    Indices of `hashes` within `max_dist` bits of `query`. Both use the signed
+    phash_u64 encoding (hex value - 2**63); XOR cancels the offset, so
+    distances are the same as on the raw 64-bit hashes.
+    """
+    if not hashes.size:
+        return np.empty(0, dtype=np.intp)
+    q = np.array(query, dtype=np.int64).view(np.uint64)[()]
+    return np.flatnonzero(_within(q, hashes.view(np.uint64), max_dist))
@@ -0,0 +1,35 @@
+# app/utils/sqlite.py
+from __future__ import annotations
+
+import sqlite3
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=60000",
+)
+
+
+def tune_conn(conn: sqlite3.Connection) -> None:
+    # WAL lets readers proceed during commits; NORMAL drops the per-commit fsync pair
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+
+
+class Conn(sqlite3.Connection):
+    """Plain Connection rejects attributes; this one can carry per-connection caches."""
+
+
+def open_conn(db_or_conn) -> sqlite3.Connection:
+    """Tuned connection to the library DB; an existing connection is passed through."""
+    if isinstance(db_or_conn, sqlite3.Connection):
+        return db_or_conn  # caller owns it (and its pragmas)
+    db_path = db_or_conn or "data/photochrono.db"
+    conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256,
+                           factory=Conn)
+    conn.row_factory = sqlite3.Row
+    tune_conn(conn)
+    return conn
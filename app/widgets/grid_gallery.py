@@ -1,5 +1,7 @@
 # ===== FILE: app/widgets/grid_gallery.py =====
 from __future__ import annotations
+import os
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
 from typing import List
@@ -7,6 +9,8 @@ from typing import List
 from PySide6 import QtCore, QtGui, QtWidgets
 
 THUMB_SIZE = 160
+# scaled thumbnails kept in memory, least recently shown evicted first
+THUMB_CACHE_SIZE = 512
 
 
 @dataclass
@@ -18,26 +22,95 @@ class GalleryItem:
     tags: dict | None = None
 
 
+class _ThumbSignals(QtCore.QObject):
+    ready = QtCore.Signal(object, object)  # cache key, QImage
+
+
+class _ThumbJob(QtCore.QRunnable):
+    """Decode one thumbnail off the GUI thread; JPEG scales in the decoder via setScaledSize."""
+
+    def __init__(self, key: tuple, edge: int):
+        super().__init__()
+        self.signals = _ThumbSignals()
+        self.key = key
+        self.edge = edge
+
+    def run(self):
+        reader = QtGui.QImageReader(self.key[0])
+        reader.setAutoTransform(True)
+        src = reader.size()
+        if src.isValid() and max(src.width(), src.height()) > self.edge:
+            reader.setScaledSize(src.scaled(self.edge, self.edge, QtCore.Qt.KeepAspectRatio))
+        self.signals.ready.emit(self.key, reader.read())
+
+
 class GalleryModel(QtCore.QAbstractListModel):
     def __init__(self, items: List[GalleryItem] | None = None):
         super().__init__()
         self._items = items or []
+        self._rows: dict[str, int] = {}
+        # path -> (path, mtime_ns, size); stat'ed once per path until the next set_items
+        self._keys: dict[str, tuple] = {}
+        self._cache: OrderedDict[tuple, QtGui.QPixmap] = OrderedDict()
+        self._pending: set[tuple] = set()
+        self._placeholder: QtGui.QPixmap | None = None
+        self._index_rows()
 
     def data(self, index, role=QtCore.Qt.DisplayRole):
         if not index.isValid():
             return None
         item = self._items[index.row()]
         if role == QtCore.Qt.DecorationRole:
-            pm = QtGui.QPixmap(str(item.path))
-            if pm.isNull():
-                # Placeholder icon
-                pm = QtGui.QPixmap(THUMB_SIZE, THUMB_SIZE)
-                pm.fill(QtGui.QColor("#222"))
-            return pm.scaled(THUMB_SIZE, THUMB_SIZE, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+            return self._thumb(str(item.path))
         if role == QtCore.Qt.ToolTipRole:
             return str(item.path)
         return None
 
+    def _thumb(self, path: str) -> QtGui.QPixmap:
+        key = self._keys.get(path)
+        if key is None:
+            try:
+                st = os.stat(path)
+                key = (path, st.st_mtime_ns, st.st_size)
+            except OSError:
+                key = (path, 0, 0)
+            self._keys[path] = key
+        pm = self._cache.get(key)
+        if pm is not None:
+            self._cache.move_to_end(key)
+            return pm
+        if key not in self._pending:
+            self._pending.add(key)
+            job = _ThumbJob(key, THUMB_SIZE * 2)
+            job.signals.ready.connect(self._on_thumb_ready)
+            QtCore.QThreadPool.globalInstance().start(job)
+        return self._placeholder_pixmap()
+
+    def _placeholder_pixmap(self) -> QtGui.QPixmap:
+        if self._placeholder is None:
+            self._placeholder = QtGui.QPixmap(THUMB_SIZE, THUMB_SIZE)
+            self._placeholder.fill(QtGui.QColor("#222"))
+        return self._placeholder
+
+    def _on_thumb_ready(self, key: tuple, img: QtGui.QImage):
+        self._pending.discard(key)
+        if img.isNull():
+            pm = self._placeholder_pixmap()  # unreadable: cached so it isn't retried
+        else:
+            pm = QtGui.QPixmap.fromImage(img).scaled(
+                THUMB_SIZE, THUMB_SIZE, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+        self._cache[key] = pm
+        while len(self._cache) > THUMB_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        row = self._rows.get(key[0])
+        if row is not None and self._keys.get(key[0]) == key:
+            idx = self.index(row)
+            self.dataChanged.emit(idx, idx, [QtCore.Qt.DecorationRole])
+
+    def _index_rows(self):
+        self._rows = {str(it.path): r for r, it in enumerate(self._items)}
+        self._keys.clear()  # re-stat on reload so edited files get new thumbnails
+
     def rowCount(self, parent=QtCore.QModelIndex()):
         return len(self._items)
 
@@ -45,11 +118,20 @@ class GalleryModel(QtCore.QAbstractListModel):
     def set_items(self, items: List[GalleryItem]):
         self.beginResetModel()
         self._items = items
+        self._index_rows()
         self.endResetModel()
 
     def item_at(self, row: int) -> GalleryItem:
         return self._items[row]
 
+    def refresh_path(self, path: str):
+        """Re-stat `path` on next paint (its file was rewritten) and repaint its row if shown."""
+        self._keys.pop(path, None)
+        row = self._rows.get(path)
+        if row is not None:
+            idx = self.index(row)
+            self.dataChanged.emit(idx, idx, [QtCore.Qt.DecorationRole])
+
 
 class GridGallery(QtWidgets.QWidget):
     selectionChanged = QtCore.Signal(object)  # emits GalleryItem
@@ -84,12 +166,67 @@ class GridGallery(QtWidgets.QWidget):
         layout.addLayout(toolbar)
         layout.addWidget(self.view)
 
+        # items from the last store load, each with one lowercased path/tag-values string;
+        # reused by reload() until the store reports a change
+        self._stale = True
+        self._all_items: List[GalleryItem] = []
+        self._haystacks: List[str] = []
+        self._row_by_id: dict[int, int] = {}
+        # previous query and the indices it matched, for extend-only typing
+        self._last_text: str | None = None
+        self._last_hits: List[int] = []
+
         self.view.selectionModel().selectionChanged.connect(self._on_selection)
-        self.search.textChanged.connect(self._apply_search)
+        # coalesce fast typing into one filter pass
+        self._search_timer = QtCore.QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
+        self._search_timer.timeout.connect(lambda: self._apply_search(self.search.text()))
+        self.search.textChanged.connect(self._search_timer.start)
+
+        # imports arrive in bursts; refetch once they settle, and only while visible
+        self._reload_timer = QtCore.QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(300)
+        self._reload_timer.timeout.connect(self.reload)
+        self.store.itemsChanged.connect(self._on_store_changed)
+        self.store.itemSaved.connect(self._on_item_saved)
+
+    @staticmethod
+    def _haystack(item: GalleryItem) -> str:
+        # NUL separator so a query can't match across two fields
+        return "\0".join([str(item.path), *(str(v) for v in (item.tags or {}).values())]).lower()
 
     def reload(self):
-        items = self.store.load_recent() if self.show_recent else self.store.load_all()
-        self.model.set_items(items)
+        if self._stale:
+            items = self.store.load_recent() if self.show_recent else self.store.load_all()
+            self._all_items = items
+            self._haystacks = [self._haystack(i) for i in items]
+            self._row_by_id = {it.id: r for r, it in enumerate(items)}
+            self._stale = False
+        self._last_text = None
+        self._apply_search(self.search.text())
+
+    def _on_store_changed(self):
+        self._stale = True
+        if self.isVisible():
+            self._reload_timer.start()
+
+    def _on_item_saved(self, item: GalleryItem):
+        # an edit changes one item: patch its entry instead of refetching the list
+        row = self._row_by_id.get(item.id)
+        if row is None:
+            return
+        mine = self._all_items[row]
+        mine.tags = item.tags
+        self._haystacks[row] = self._haystack(mine)
+        self.model.refresh_path(str(mine.path))  # EXIF writeback touched the file
+        self._last_text = None  # the last hits were matched against the old text
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._stale:
+            self._reload_timer.start()
 
     def _on_selection(self):
         idxs = self.view.selectedIndexes()
@@ -99,12 +236,15 @@ class GridGallery(QtWidgets.QWidget):
         self.selectionChanged.emit(item)
 
     def _apply_search(self, text: str):
-        # naive client-side filter for now
-        all_items = self.store.load_recent() if self.show_recent else self.store.load_all()
+        # client-side filter over the precomputed haystacks; a longer query only narrows the last hits
         text_low = text.lower()
-        filtered = [i for i in all_items if text_low in str(i.path).lower() or any(
-            text_low in (str(v).lower()) for v in (i.tags or {}).values())]
-        self.model.set_items(filtered)
+        if self._last_text is not None and text_low.startswith(self._last_text):
+            candidates = self._last_hits
+        else:
+            candidates = range(len(self._all_items))
+        hits = [i for i in candidates if text_low in self._haystacks[i]]
+        self._last_text, self._last_hits = text_low, hits
+        self.model.set_items([self._all_items[i] for i in hits])
 
     def _on_size(self, value: int):
         self.view.setIconSize(QtCore.QSize(value, value))
@@ -1,11 +1,10 @@
 from __future__ import annotations
-import sqlite3
+import json
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 from PySide6 import QtCore, QtGui, QtWidgets
 from PySide6.QtCore import Qt, QDate
-from PySide6.QtGui import QPixmap
 from PySide6.QtWidgets import (
     QWidget, QDockWidget, QLabel, QPushButton, QLineEdit, QComboBox,
     QHBoxLayout, QVBoxLayout, QMessageBox, QCheckBox, QSplitter,
@@ -14,9 +13,9 @@ from PySide6.QtWidgets import (
 
 # --- DB + helpers (from your ui_tagging.py) ---
 from app.ui_tagging import (
-    _open_conn, _ensure_core_tables, load_people, add_person,
-    upsert_person_tag, replace_date_tag, fetch_faces_for_photo,
-    fetch_tags_for_photo, photos_by_phash, fetch_phash,
+    _ensure_core_tables, load_people, add_person,
+    upsert_person_tag, replace_date_tag, replace_date_tags, fetch_faces_for_photo,
+    fetch_tags_for_photo, photos_by_phash, fetch_phash, DUPE_MAX_DIST,
     PhotoItem
 )
 from app.ui_tagging import FacePreview
@@ -31,11 +30,15 @@ class TaggingPanel(QDockWidget):
     def __init__(self, store: Store, parent=None):
         super().__init__("Tagging", parent)
         self.store = store
-        self.conn = sqlite3.connect(str(self.store.db_path))
-        self.conn.row_factory = sqlite3.Row
+        # share the store's connection: one page cache, one WAL writer
+        self.conn = self.store.connection()
         _ensure_core_tables(self.conn)
 
         self.current: Optional[PhotoItem] = None
+        # photo_id -> (people label HTML, newest ISO date or None), valid while
+        # _tag_html_version matches the DB (see _tag_labels)
+        self._tag_html_cache: Dict[int, Tuple[str, Optional[str]]] = {}
+        self._tag_html_version: Optional[Tuple[int, int]] = None
         self._init_ui()
         self._load_people()
 
@@ -96,7 +99,7 @@ class TaggingPanel(QDockWidget):
         drow.addWidget(self.dateLine, 1)
         drow.addWidget(self.btnCalendar)
         form.addLayout(drow)
-        self.applyToDupes = QCheckBox("Apply to duplicates (same phash)")
+        self.applyToDupes = QCheckBox("Apply to duplicates (near-identical phash)")
         self.applyToDupes.setChecked(True)
         form.addWidget(self.applyToDupes)
 
@@ -123,7 +126,9 @@ class TaggingPanel(QDockWidget):
         gb = QGroupBox("Existing Tags")
         gbl = QVBoxLayout(gb)
         self.tagsPeopleLbl = QLabel("— none —")
+        self.tagsPeopleLbl.setTextFormat(Qt.RichText)
         self.tagsDateLbl = QLabel("— none —")
+        self.tagsDateLbl.setTextFormat(Qt.PlainText)
         gbl.addWidget(QLabel("People:"))
         gbl.addWidget(self.tagsPeopleLbl)
         gbl.addWidget(QLabel("Date:"))
@@ -149,6 +154,13 @@ class TaggingPanel(QDockWidget):
         self._date_autosave.setSingleShot(True)
         self._date_autosave.setInterval(600)
         self._date_autosave.timeout.connect(self._autosave_date)
+        # same for the form fields: one DB + EXIF write per typing burst
+        self._form_autosave = QtCore.QTimer(self)
+        self._form_autosave.setSingleShot(True)
+        self._form_autosave.setInterval(600)
+        self._form_autosave.timeout.connect(self._autosave_form)
+        # the last typing burst must not wait on a timer that never fires
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self._flush_autosave)
 
         for w, sig in [
             (self.title, self.title.textChanged),
@@ -165,27 +177,40 @@ class TaggingPanel(QDockWidget):
 
     # --- Loading ---
     def load_item(self, item: PhotoItem):
+        self._flush_autosave()  # pending edits belong to the outgoing item
         self.current = item
-        self.preview.set_image(QPixmap(item.path))
+        # decode at preview size (DCT-scaled for JPEG) instead of full resolution
+        self.preview.set_image(*FacePreview._load_pixmap_for_widget(str(item.path), self.preview))
         self.preview.set_faces(fetch_faces_for_photo(self.conn, item.photo_id))
 
-        tags_people, tags_date = fetch_tags_for_photo(self.conn, item.photo_id)
-        self.tagsPeopleLbl.setText(
-            " • " + "<br> • ".join(r["display_name"] for r in tags_people)
-            if tags_people else "— none —"
-        )
-        if tags_date:
-            self.tagsDateLbl.setText(tags_date[0]["iso_dt"])
+        people_html, iso_dt = self._tag_labels(item.photo_id)
+        self.tagsPeopleLbl.setText(people_html)
+        if iso_dt:
+            self.tagsDateLbl.setText(iso_dt)
             self.dateLine.setText(QDate.fromString(
-                tags_date[0]["iso_dt"], "yyyy-MM-dd"
+                iso_dt, "yyyy-MM-dd"
             ).toString("MM-dd-yyyy"))
         else:
             self.tagsDateLbl.setText("— none —")
 
+    def _tag_labels(self, photo_id: int) -> Tuple[str, Optional[str]]:
+        # any write drops the cache: data_version moves for other connections' commits,
+        # total_changes for this shared one (the other panel, Store.save_item, our own edits)
+        version = (self.conn.execute("PRAGMA data_version").fetchone()[0], self.conn.total_changes)
+        if version != self._tag_html_version:
+            self._tag_html_cache.clear()
+            self._tag_html_version = version
+        cached = self._tag_html_cache.get(photo_id)
+        if cached is None:
+            tags_people, tags_date = fetch_tags_for_photo(self.conn, photo_id)
+            people_html = (" • " + "<br> • ".join([r["display_name"] for r in tags_people])
+                           if tags_people else "— none —")
+            cached = (people_html, tags_date[0]["iso_dt"] if tags_date else None)
+            self._tag_html_cache[photo_id] = cached
+        return cached
+
     # --- Change handling ---
-    def _emit_change(self, *a):
-        if not self.current:
-            return
+    def _collect_tags(self):
         self.current.tags = {
             "title": self.title.text().strip(),
             "keywords": [s.strip() for s in self.keywords.text().split(",") if s.strip()],
@@ -194,10 +219,33 @@ class TaggingPanel(QDockWidget):
             "notes": self.notes.toPlainText().strip(),
             "date": self.dateLine.text(),
         }
-        self.tagChanged.emit(self.current)
 
+    def _emit_change(self, *a):
+        if not self.current:
+            return
+        self._collect_tags()
+        self._form_autosave.start()  # save (and announce) once the typing stops
+
+    def _autosave_form(self):
+        self._form_autosave.stop()
+        if not self.current:
+            return
+        self._collect_tags()
         # --- save via Store (DB + EXIF) ---
         self.store.save_item(self.current)
+        self.tagChanged.emit(self.current)  # already saved; listeners only refresh
+
+    def _flush_autosave(self):
+        if self._form_autosave.isActive():
+            self._autosave_form()
+
+    def hideEvent(self, event: QtGui.QHideEvent):
+        self._flush_autosave()  # dock closed/hidden
+        super().hideEvent(event)
+
+    def closeEvent(self, event: QtGui.QCloseEvent):
+        self._flush_autosave()
+        super().closeEvent(event)
 
     # --- Date ---
 
@@ -217,18 +265,16 @@ class TaggingPanel(QDockWidget):
         if not qd.isValid():
             return
         iso = qd.toString("yyyy-MM-dd")
-        replace_date_tag(self.conn, self.current.photo_id,
-                         iso, source="human", conf=1.0)
-        if self.applyToDupes.isChecked():
-            ph = fetch_phash(self.conn, self.current.photo_id)
-            if ph:
-                for pid in photos_by_phash(self.conn, ph):
-                    replace_date_tag(self.conn, pid, iso,
-                                     source="propagated", conf=0.95)
-        self.conn.commit()
+        with self.conn:
+            replace_date_tag(self.conn, self.current.photo_id,
+                             iso, source="human", conf=1.0)
+            if self.applyToDupes.isChecked():
+                ph = fetch_phash(self.conn, self.current.photo_id)
+                if ph is not None:
+                    replace_date_tags(self.conn, photos_by_phash(self.conn, ph, max_dist=DUPE_MAX_DIST),
+                                      iso, source="propagated", conf=0.95)
 
-        self.store.save_item(self.current)
-        self._emit_change()
+        self._autosave_form()  # the date was already debounced; write it now
 
     # --- People ---
 
@@ -266,39 +312,40 @@ class TaggingPanel(QDockWidget):
         person_id = int(self.peopleBox.currentData())
 
         qmarks = ",".join(["?"] * len(face_ids))
-        rows = self.conn.execute(
-            f"SELECT face_id, cluster_id FROM face_boxes WHERE photo_id=? AND face_id IN ({qmarks})",
-            (self.current.photo_id, *face_ids)
-        ).fetchall()
-        cluster_ids = sorted({r["cluster_id"]
-                             for r in rows if r["cluster_id"]})
-
-        self.conn.execute(
-            f"UPDATE face_boxes SET assigned_person_id=? WHERE photo_id=? AND face_id IN ({qmarks})",
-            (person_id, self.current.photo_id, *face_ids)
-        )
-        upsert_person_tag(self.conn, self.current.photo_id,
-                          person_id, source="face", conf=1.0)
-
-        for cid in cluster_ids:
-            self.conn.execute("UPDATE face_boxes SET assigned_person_id=? WHERE cluster_id=?",
-                              (person_id, cid))
-        if cluster_ids:
-            rows2 = self.conn.execute(
-                f"SELECT DISTINCT photo_id FROM face_boxes WHERE cluster_id IN ({','.join('?'*len(cluster_ids))})",
-                cluster_ids
+        # one transaction for the whole assignment: commits once, rolls back on error
+        with self.conn:
+            rows = self.conn.execute(
+                f"SELECT face_id, cluster_id FROM face_boxes WHERE photo_id=? AND face_id IN ({qmarks})",
+                (self.current.photo_id, *face_ids)
             ).fetchall()
-            for r in rows2:
-                self.conn.execute("""
+            cluster_ids = sorted({r["cluster_id"]
+                                 for r in rows if r["cluster_id"]})
+
+            self.conn.execute(
+                f"UPDATE face_boxes SET assigned_person_id=? WHERE photo_id=? AND face_id IN ({qmarks})",
+                (person_id, self.current.photo_id, *face_ids)
+            )
+            upsert_person_tag(self.conn, self.current.photo_id,
+                              person_id, source="face", conf=1.0)
+
+            self.conn.executemany("UPDATE face_boxes SET assigned_person_id=? WHERE cluster_id=?",
+                                  [(person_id, cid) for cid in cluster_ids])
+            if cluster_ids:
+                # one JSON bind, so large clusters can't hit the bound-parameter limit
+                rows2 = self.conn.execute(
+                    "SELECT DISTINCT photo_id FROM face_boxes "
+                    "WHERE cluster_id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(cluster_ids),)
+                ).fetchall()
+                self.conn.executemany("""
                     INSERT INTO photo_tags(photo_id, tag_type, tag_value, source, confidence)
                     VALUES (?, 'person', ?, 'propagated_cluster', 0.90)
                     ON CONFLICT(photo_id, tag_type, tag_value) DO NOTHING
-                """, (r["photo_id"], str(person_id)))
-        self.conn.commit()
+                """, [(r["photo_id"], str(person_id)) for r in rows2])
 
         self.preview.set_faces(fetch_faces_for_photo(
             self.conn, self.current.photo_id))
-        self._emit_change()  # writes EXIF now
+        self._autosave_form()  # writes EXIF now
 
     def _clear_person_faces(self):
         if not self.current:
@@ -309,24 +356,23 @@ class TaggingPanel(QDockWidget):
                 self, "Remove Person", "Select one or more face rectangles first.")
             return
         qmarks = ",".join(["?"] * len(face_ids))
-        rows = self.conn.execute(
-            f"SELECT face_id, assigned_person_id FROM face_boxes WHERE photo_id=? AND face_id IN ({qmarks})",
-            (self.current.photo_id, *face_ids)
-        ).fetchall()
-        person_ids = {r["assigned_person_id"]
-                      for r in rows if r["assigned_person_id"] is not None}
-
-        self.conn.execute(
-            f"UPDATE face_boxes SET assigned_person_id=NULL WHERE photo_id=? AND face_id IN ({qmarks})",
-            (self.current.photo_id, *face_ids)
-        )
-        for pid in person_ids:
-            self.conn.execute("""
+        with self.conn:
+            rows = self.conn.execute(
+                f"SELECT face_id, assigned_person_id FROM face_boxes WHERE photo_id=? AND face_id IN ({qmarks})",
+                (self.current.photo_id, *face_ids)
+            ).fetchall()
+            person_ids = {r["assigned_person_id"]
+                          for r in rows if r["assigned_person_id"] is not None}
+
+            self.conn.execute(
+                f"UPDATE face_boxes SET assigned_person_id=NULL WHERE photo_id=? AND face_id IN ({qmarks})",
+                (self.current.photo_id, *face_ids)
+            )
+            self.conn.executemany("""
                 DELETE FROM photo_tags
                 WHERE photo_id=? AND tag_type='person' AND tag_value=? AND source='propagated_cluster'
-            """, (self.current.photo_id, str(pid)))
-        self.conn.commit()
+            """, [(self.current.photo_id, str(pid)) for pid in person_ids])
 
         self.preview.set_faces(fetch_faces_for_photo(
             self.conn, self.current.photo_id))
-        self._emit_change()  # writes EXIF now
+        self._autosave_form()  # writes EXIF now
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Bake db_migrations/*.sql into a Python manifest that migrate.py imports
+instead of scanning, reading and hashing the directory on every boot.
+
+Usage:
+  python scripts/bake_migrations.py
+  python scripts/bake_migrations.py --dir db_migrations --out scripts/migrations_compiled.py
+
+Re-run after adding a migration, then apply with `migrate.py --baked`.
+"""
+from __future__ import annotations
+import argparse
+import sys
+from pathlib import Path
+
+from migrate import file_checksum
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dir", default="db_migrations", help="Migrations directory")
+    ap.add_argument("--out", default=str(Path(__file__).with_name("migrations_compiled.py")),
+                    help="Manifest to write (must sit next to migrate.py to be picked up)")
+    args = ap.parse_args()
+
+    mig_dir = Path(args.dir)
+    if not mig_dir.exists():
+        print(f"✖ Migrations dir not found: {mig_dir}", file=sys.stderr)
+        return 1
+
+    files = sorted((p for p in mig_dir.glob("*.sql") if p.is_file()), key=lambda p: p.name)
+    lines = [
+        "# Generated by scripts/bake_migrations.py; do not edit.",
+        "MIGRATIONS = [",
+        *(f"    ({f.name!r}, {f.read_bytes()!r}, {file_checksum(f)!r})," for f in files),
+        "]",
+        "",
+    ]
+    Path(args.out).write_text("\n".join(lines), encoding="utf-8")
+    print(f"Baked {len(files)} migrations into {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
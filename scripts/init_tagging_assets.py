@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import sqlite3, sys, os, hashlib, math
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from PIL import Image
 import imagehash
@@ -11,8 +12,8 @@ def ensure_tables(conn):
     conn.executescript("""
     CREATE TABLE IF NOT EXISTS phash (
       photo_id INTEGER PRIMARY KEY,
-      phash_hex TEXT NOT NULL
-    );
+      phash_u64 INTEGER NOT NULL
+    ) WITHOUT ROWID;
     CREATE TABLE IF NOT EXISTS face_boxes (
       photo_id INTEGER NOT NULL,
       face_id INTEGER NOT NULL,
@@ -22,7 +23,24 @@ def ensure_tables(conn):
       PRIMARY KEY(photo_id, face_id)
     );
     """)
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(phash)")]
+    rebuilt = "phash_hex" in cols
+    if rebuilt:
+        # older layout (hex text + nullable key): keep only the 8-byte integer key
+        key_col = "phash_u64" if "phash_u64" in cols else "NULL"
+        old = conn.execute(f"SELECT photo_id, phash_hex, {key_col} FROM phash").fetchall()
+        conn.execute("DROP TABLE phash")
+        conn.execute("CREATE TABLE phash (photo_id INTEGER PRIMARY KEY, phash_u64 INTEGER NOT NULL) WITHOUT ROWID")
+        conn.executemany("INSERT OR REPLACE INTO phash(photo_id, phash_u64) VALUES (?,?)",
+                         [(pid, key if key is not None else phash_to_u64(ph)) for pid, ph, key in old])
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_phash_u64 ON phash(phash_u64)")
     conn.commit()
+    if rebuilt:
+        conn.execute("VACUUM")
+
+def phash_to_u64(phash_hex):
+    # same key as app.ui_tagging.phash_to_u64: signed 64-bit, offset by 2**63
+    return int(phash_hex, 16) - (1 << 63)
 
 def get_photos(conn):
     # support either 'photos' or 'images' table with a 'path' column
@@ -34,25 +52,30 @@ def get_photos(conn):
             continue
     raise SystemExit("No 'photos' or 'images' table with a path column found.")
 
-def compute_phash(conn, table, rows):
+def _phash_one(pid, p):
+    try:
+        if os.stat(p).st_size == 0:
+            return None
+        with Image.open(p) as im:
+            # JPEG: let libjpeg decode at 1/2..1/8 scale; phash only looks at 32x32 anyway
+            im.draft("RGB", (256, 256))
+            h = imagehash.phash(im.convert("RGB"))
+    except Exception:
+        # skip unreadable
+        return None
+    return (pid, phash_to_u64(str(h)))
+
+def compute_phash(conn, table, rows, batch=500):
     done = set(r[0] for r in conn.execute("SELECT photo_id FROM phash"))
-    ins = []
-    for pid, p in rows:
-        if pid in done: continue
-        try:
-            with Image.open(p) as im:
-                im = im.convert("RGB")
-                h = imagehash.phash(im)
-            ins.append((pid, h.__str__()))
-        except Exception:
-            # skip unreadable
-            continue
-        if len(ins) >= 500:
-            conn.executemany("INSERT OR REPLACE INTO phash(photo_id, phash_hex) VALUES (?,?)", ins)
-            conn.commit(); ins.clear()
-    if ins:
-        conn.executemany("INSERT OR REPLACE INTO phash(photo_id, phash_hex) VALUES (?,?)", ins)
-        conn.commit()
+    todo = [(pid, p) for pid, p in rows if pid not in done]
+    # decoders release the GIL, so threads overlap file I/O and decode across cores
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as ex:
+        for i in range(0, len(todo), batch):
+            chunk = todo[i:i + batch]
+            ins = [r for r in ex.map(lambda t: _phash_one(*t), chunk) if r]
+            if ins:
+                conn.executemany("INSERT OR REPLACE INTO phash(photo_id, phash_u64) VALUES (?,?)", ins)
+                conn.commit()
 
 def main():
     conn = sqlite3.connect(DB)
@@ -6,47 +6,376 @@ Usage:
   python scripts/migrate.py --db data/photochrono.db
   python scripts/migrate.py --db data/photochrono.db --dir db_migrations
   python scripts/migrate.py --db data/photochrono.db --status
+  python scripts/migrate.py --db data/photochrono.db --baked
+
+--baked runs the manifest written by scripts/bake_migrations.py (no reads or
+hashing of the .sql files). If the migrations dir is present its file names
+must match the manifest, so a forgotten re-bake fails instead of skipping.
 """
 from __future__ import annotations
 import argparse
 import hashlib
+import json
+import mmap
+import os
+import re
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import NamedTuple
 import sqlite3
 
+# Optional: xxh3 hashes many times faster than SHA-256; falls back to SHA-256 without it
+try:
+    import xxhash  # type: ignore
+except Exception:
+    xxhash = None
+
+# Optional: written by bake_migrations.py next to this script
+try:
+    from migrations_compiled import MIGRATIONS  # type: ignore
+except ImportError:
+    MIGRATIONS = None
+
+
+# Same tuning as the app's connections. NORMAL rather than OFF: in WAL that skips the
+# per-commit fsync, yet a power cut can only roll back the last commits, never corrupt.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA busy_timeout=30000",
+)
+
+# fixed strings, so every run's executes hit the same cached prepared statements
+INSERT_SQL = ("INSERT INTO schema_migrations(filename, checksum, applied_at, size, mtime_ns) "
+              "VALUES (?,?,?,?,?)")
+RESTAT_SQL = "UPDATE schema_migrations SET size=?, mtime_ns=? WHERE filename=?"
+RECHECKSUM_SQL = "UPDATE schema_migrations SET checksum=? WHERE filename=?"
+FINGERPRINT_GET_SQL = "SELECT value FROM migrate_meta WHERE key=?"
+FINGERPRINT_SET_SQL = "INSERT OR REPLACE INTO migrate_meta(key, value) VALUES (?,?)"
+CACHE_SQL = "INSERT OR REPLACE INTO checksum_cache(path, size, mtime_ns, checksum) VALUES (?,?,?,?)"
+
+
+_MIGRATIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS {name} (
+      filename   TEXT PRIMARY KEY,
+      checksum   TEXT NOT NULL,
+      applied_at TEXT NOT NULL,
+      size       INTEGER,
+      mtime_ns   INTEGER
+    ) WITHOUT ROWID
+"""
+
+
+def _migration_tables_current(conn: sqlite3.Connection) -> bool:
+    """True when every bookkeeping table exists in its latest shape (the steady state)."""
+    tables = dict(conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type='table' "
+        "AND name IN ('schema_migrations', 'checksum_cache', 'migrate_meta')"))
+    sql = tables.get("schema_migrations", "").upper()
+    return len(tables) == 3 and "WITHOUT ROWID" in sql and "MTIME_NS" in sql
+
 
 def ensure_migrations_table(conn: sqlite3.Connection) -> None:
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS schema_migrations (
-          filename   TEXT PRIMARY KEY,
-          checksum   TEXT NOT NULL,
-          applied_at TEXT NOT NULL
-        )
-    """)
-    conn.commit()
+    if _migration_tables_current(conn):
+        return  # one read, no write transaction
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(_MIGRATIONS_DDL.format(name="schema_migrations"))
+        # older tables: the file stats that let unchanged files skip hashing
+        cols = [r[1] for r in conn.execute("PRAGMA table_info(schema_migrations)")]
+        for col in ("size", "mtime_ns"):
+            if col not in cols:
+                conn.execute(f"ALTER TABLE schema_migrations ADD COLUMN {col} INTEGER")
+        # older tables are rowid tables: rebuild once so a filename probe is a single B-tree
+        (sql,) = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type='table' AND name='schema_migrations'").fetchone()
+        if "WITHOUT ROWID" not in sql.upper():
+            conn.execute(_MIGRATIONS_DDL.format(name="schema_migrations_new"))
+            conn.execute("""
+                INSERT INTO schema_migrations_new(filename, checksum, applied_at, size, mtime_ns)
+                SELECT filename, checksum, applied_at, size, mtime_ns FROM schema_migrations
+                WHERE filename IS NOT NULL
+            """)
+            conn.execute("DROP TABLE schema_migrations")
+            conn.execute("ALTER TABLE schema_migrations_new RENAME TO schema_migrations")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS checksum_cache (
+              path     TEXT PRIMARY KEY,
+              size     INTEGER NOT NULL,
+              mtime_ns INTEGER NOT NULL,
+              checksum TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS migrate_meta (
+              key   TEXT PRIMARY KEY,
+              value TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+class BakedMigration(NamedTuple):
+    """One entry of the baked manifest; has the name/read_bytes() a Path offers here."""
+    name: str
+    sql: bytes
+    checksum: str
+
+    def read_bytes(self) -> bytes:
+        return self.sql
+
+
+class BakedStat(NamedTuple):
+    """Stands in for os.stat_result: no mtime, so stat-skip never applies and checksums decide."""
+    st_size: int
+    st_mtime_ns: int | None = None
+
+
+# below this, one read() is cheaper than setting up a mapping
+MMAP_MIN_SIZE = 64 * 1024
+
+
+def _hexdigest(p: Path, hasher) -> str:
+    """Feed `p` to `hasher`; large files are hashed straight from the page cache via mmap."""
+    if not isinstance(p, Path):
+        hasher.update(p.read_bytes())  # baked: already in memory
+        return hasher.hexdigest()
+    with open(p, "rb") as f:
+        if p.stat().st_size < MMAP_MIN_SIZE:
+            hasher.update(f.read())
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hasher.update(mm)
+    return hasher.hexdigest()
 
 
 def file_checksum(p: Path) -> str:
-    return hashlib.sha256(p.read_bytes()).hexdigest()
+    """
+    Detects edits to applied migrations (not an integrity check): xxh3-64
+    (16 hex chars) when xxhash is installed, else SHA-256 (64 hex chars).
+    """
+    if xxhash is not None:
+        return _hexdigest(p, xxhash.xxh3_64())
+    return _hexdigest(p, hashlib.sha256())
+
+
+def stored_checksum_matches(p: Path, stored: str) -> bool | None:
+    """
+    Check `p` against a checksum recorded by the other algorithm (told apart
+    by length). None when that algorithm isn't available here.
+    """
+    if len(stored) == 64:
+        return _hexdigest(p, hashlib.sha256()) == stored
+    if xxhash is None:
+        return None
+    return _hexdigest(p, xxhash.xxh3_64()) == stored
+
+
+def split_sql(sql: str):
+    """
+    Yield the statements of a script one at a time. A ';' only ends a
+    statement when SQLite agrees it is complete, so triggers and quoted
+    semicolons stay whole. A last statement without its ';' still runs (as
+    executescript would), even when a trailing -- comment hides the one
+    added here; anything that is still incomplete raises.
+    """
+    buf = ""
+    for part in sql.split(";"):
+        buf += part + ";"
+        if sqlite3.complete_statement(buf):
+            yield buf
+            buf = ""
+    tail = buf[:-1]  # drop the ';' the loop appended
+    if tail.strip():
+        stmt = tail + "\n;"
+        if not sqlite3.complete_statement(stmt):
+            raise sqlite3.OperationalError(f"incomplete SQL statement at end of script: {tail.strip()[:80]!r}")
+        yield stmt
+
+
+# `INSERT [OR x] INTO t[(cols)] VALUES (...);` with nothing after the row list
+_VALUES_INSERT = re.compile(
+    r"^\s*(INSERT\s+(?:OR\s+\w+\s+)?INTO\s+[^;]*?\s+VALUES)\s*(\(.*\))\s*;\s*$",
+    re.IGNORECASE | re.DOTALL)
+# comments too: a trailing "-- ..." would swallow the rows joined after it
+_NOT_PLAIN_ROWS = re.compile(r"\b(?:ON\s+CONFLICT|RETURNING|SELECT)\b|--|/\*", re.IGNORECASE)
+INSERT_BATCH_ROWS = 500
+
+
+def _split_values_insert(stmt: str) -> tuple[str, str, str] | None:
+    """(key, prefix, rows) for a plain literal-VALUES insert, else None."""
+    m = _VALUES_INSERT.match(stmt)
+    if m is None or _NOT_PLAIN_ROWS.search(m.group(2)):
+        return None
+    prefix = m.group(1).strip()
+    return " ".join(prefix.split()).lower(), prefix, m.group(2)
+
+
+def group_inserts(statements):
+    """
+    Fold runs of inserts into the same table/columns into multi-row
+    INSERT ... VALUES (..),(..) statements of up to INSERT_BATCH_ROWS rows,
+    so seed-data migrations parse once per batch instead of once per row.
+    """
+    key = prefix = None
+    rows: list[str] = []
+    for stmt in statements:
+        parts = _split_values_insert(stmt)
+        if rows and (parts is None or parts[0] != key or len(rows) >= INSERT_BATCH_ROWS):
+            yield f"{prefix} {','.join(rows)};"
+            rows = []
+        if parts is None:
+            yield stmt
+        else:
+            if not rows:
+                key, prefix = parts[0], parts[1]
+            rows.append(parts[2])
+    if rows:
+        yield f"{prefix} {','.join(rows)};"
 
 
 def apply_sql(conn: sqlite3.Connection, path: Path) -> None:
-    sql = path.read_text(encoding="utf-8")
-    with conn:  # single transaction
-        conn.executescript(sql)
+    # statement by statement, not executescript: that would COMMIT the caller's transaction
+    for stmt in group_inserts(split_sql(path.read_bytes().decode("utf-8"))):
+        conn.execute(stmt)
+
+
+def checksum_all(paths: list[Path]) -> dict[str, str]:
+    """filename -> file_checksum; hashers release the GIL, so larger sets fan out over threads."""
+    if len(paths) <= 4:
+        return {p.name: file_checksum(p) for p in paths}
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 4)) as ex:
+        return dict(zip((p.name for p in paths), ex.map(file_checksum, paths)))
+
+
+def cached_checksums(conn: sqlite3.Connection, paths: list[Path],
+                     stats: dict[str, os.stat_result]) -> dict[str, str]:
+    """
+    checksum_all, reusing checksum_cache rows whose (size, mtime_ns) still
+    match. New checksums are committed right away, outside the migration
+    transaction, so a run that rolls back doesn't have to hash them again.
+    """
+    keys = {p.name: str(p.resolve()) for p in paths}
+    cached = {row[0]: row[1:] for row in conn.execute(
+        "SELECT path, size, mtime_ns, checksum FROM checksum_cache "
+        "WHERE path IN (SELECT value FROM json_each(?))", (json.dumps(list(keys.values())),))}
+    width = 16 if xxhash is not None else 64  # a cached checksum from the other algorithm is a miss
+    out: dict[str, str] = {}
+    todo: list[Path] = []
+    for p in paths:
+        st = stats[p.name]
+        hit = cached.get(keys[p.name])
+        if hit and hit[:2] == (st.st_size, st.st_mtime_ns) and len(hit[2]) == width:
+            out[p.name] = hit[2]
+        else:
+            todo.append(p)
+    fresh = checksum_all(todo)
+    if fresh:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(CACHE_SQL, [
+                (keys[name], stats[name].st_size, stats[name].st_mtime_ns, checksum)
+                for name, checksum in fresh.items()])
+    out.update(fresh)
+    return out
+
+
+def _digest_text(text: str) -> str:
+    if xxhash is not None:
+        return xxhash.xxh3_64(text.encode()).hexdigest()
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def dir_fingerprint(stats: dict[str, os.stat_result]) -> str:
+    """Digest of every migration's (name, size, mtime_ns): equal means nothing on disk moved."""
+    return _digest_text(";".join(
+        f"{name}:{st.st_size}:{st.st_mtime_ns}" for name, st in sorted(stats.items())))
 
 
-def list_applied(conn: sqlite3.Connection) -> dict[str, str]:
-    return {row[0]: row[1] for row in conn.execute(
-        "SELECT filename, checksum FROM schema_migrations"
-    )}
+def manifest_fingerprint(migrations: list[BakedMigration]) -> str:
+    """Same idea for a baked manifest, over names and the checksums baked with them."""
+    return _digest_text(";".join(f"{m.name}:{m.checksum}" for m in migrations))
+
+
+def list_applied(conn: sqlite3.Connection,
+                 filenames: list[str] | None = None) -> dict[str, tuple[str, int | None, int | None]]:
+    """
+    filename -> (checksum, size, mtime_ns) as recorded when last verified;
+    only for `filenames` when given (one primary-key probe each, not a scan).
+    """
+    sql = "SELECT filename, checksum, size, mtime_ns FROM schema_migrations"
+    params: tuple = ()
+    if filenames is not None:
+        # one JSON bind, so long migration lists can't hit the bound-parameter limit
+        sql += " WHERE filename IN (SELECT value FROM json_each(?))"
+        params = (json.dumps(filenames),)
+    return {row[0]: (row[1], row[2], row[3]) for row in conn.execute(sql, params)}
+
+
+def apply_pending(conn: sqlite3.Connection, files: list[Path],
+                  applied: dict[str, tuple[str, int | None, int | None]],
+                  stats: dict[str, os.stat_result], checksums: dict[str, str]) -> int:
+    """Verify applied files and apply pending ones inside the caller's transaction; returns an exit code."""
+    # bookkeeping rows, written in one executemany each after the loop
+    inserts: list[tuple] = []
+    restats: list[tuple] = []
+    applied_at = time.strftime("%Y-%m-%dT%H:%M:%S")  # one run, one timestamp
+    for f in files:
+        st = stats[f.name]
+        if f.name in applied:
+            stored, size, mtime_ns = applied[f.name]
+            if mtime_ns is not None and (size, mtime_ns) == (st.st_size, st.st_mtime_ns):
+                print(f"✓ {f.name} already applied")
+                continue
+            checksum = checksums[f.name]
+            if stored != checksum and len(stored) != len(checksum):
+                same = stored_checksum_matches(f, stored)
+                if same is None:
+                    print(f"✖ {f.name} was recorded with an xxh3 checksum; install xxhash to verify it.",
+                          file=sys.stderr)
+                    return 2
+                if same:
+                    # recorded by the other algorithm: store this run's checksum from now on
+                    conn.execute(RECHECKSUM_SQL, (checksum, f.name))
+                    stored = checksum
+            if stored != checksum:
+                print(
+                    f"✖ {f.name} was already applied but the file has changed.\n"
+                    f"  Create a new migration instead of editing an applied one.",
+                    file=sys.stderr,
+                )
+                return 2
+            if st.st_mtime_ns is not None:
+                restats.append((st.st_size, st.st_mtime_ns, f.name))
+            print(f"✓ {f.name} already applied")
+            continue
+
+        checksum = checksums[f.name]
+        print(f"→ Applying {f.name} ...")
+        apply_sql(conn, f)
+        inserts.append((f.name, checksum, applied_at, st.st_size, st.st_mtime_ns))
+        applied[f.name] = (checksum, st.st_size, st.st_mtime_ns)  # keep the view current
+        print(f"✔ Applied {f.name}")
+
+    conn.executemany(INSERT_SQL, inserts)
+    conn.executemany(RESTAT_SQL, restats)
+    return 0
 
 
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--db", required=True, help="Path to SQLite DB file")
     ap.add_argument("--dir", default="db_migrations", help="Migrations directory")
+    ap.add_argument("--baked", action="store_true",
+                    help="Apply the manifest from bake_migrations.py instead of reading --dir")
     ap.add_argument("--status", action="store_true",
                     help="Show applied/pending and exit (no changes)")
     args = ap.parse_args()
@@ -57,19 +386,42 @@ def main() -> int:
     if not db_path.exists():
         print(f"✖ DB not found: {db_path}", file=sys.stderr)
         return 1
-    if not mig_dir.exists():
+    if args.baked and MIGRATIONS is None:
+        print("✖ No baked manifest; run scripts/bake_migrations.py first", file=sys.stderr)
+        return 1
+    if not args.baked and not mig_dir.exists():
         print(f"✖ Migrations dir not found: {mig_dir}", file=sys.stderr)
         return 1
 
-    conn = sqlite3.connect(str(db_path))
-    ensure_migrations_table(conn)
+    entries = []
+    if mig_dir.exists():
+        # DirEntry carries the type (and, once asked, the stat), so each file costs one syscall
+        with os.scandir(mig_dir) as it:
+            entries = sorted((e for e in it if e.name.endswith(".sql") and e.is_file()),
+                             key=lambda e: e.name)
 
-    applied = list_applied(conn)
-    files = sorted(mig_dir.glob("*.sql"), key=lambda p: p.name)
+    baked = None
+    if args.baked:
+        baked = sorted((BakedMigration(*m) for m in MIGRATIONS), key=lambda m: m.name)
+        if entries and [e.name for e in entries] != [m.name for m in baked]:
+            print(f"✖ Baked manifest is out of date with {mig_dir}; re-run scripts/bake_migrations.py",
+                  file=sys.stderr)
+            return 1
+        files = baked
+    else:
+        files = [Path(e.path) for e in entries]
 
     if args.status:
+        # read-only: no bookkeeping setup, no write lock, writers carry on meanwhile
+        conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            applied = {row[0] for row in conn.execute("SELECT filename FROM schema_migrations")}
+        except sqlite3.OperationalError:
+            applied = set()  # never migrated
+        finally:
+            conn.close()
         print(f"DB: {db_path}")
-        print(f"Dir: {mig_dir}")
+        print(f"Dir: {mig_dir}" if baked is None else "Dir: (baked manifest)")
         print("\nApplied migrations:")
         if applied:
             for fname in sorted(applied):
@@ -85,28 +437,54 @@ def main() -> int:
             print("  (none)")
         return 0
 
-    for f in files:
-        checksum = file_checksum(f)
-        if f.name in applied:
-            if applied[f.name] != checksum:
-                print(
-                    f"✖ {f.name} was already applied but the file has changed.\n"
-                    f"  Create a new migration instead of editing an applied one.",
-                    file=sys.stderr,
-                )
-                return 2
-            print(f"✓ {f.name} already applied")
-            continue
+    conn = sqlite3.connect(str(db_path), isolation_level=None, cached_statements=256)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    ensure_migrations_table(conn)
 
-        print(f"→ Applying {f.name} ...")
-        apply_sql(conn, f)
-        conn.execute(
-            "INSERT INTO schema_migrations(filename, checksum, applied_at) VALUES (?,?,?)",
-            (f.name, checksum, time.strftime("%Y-%m-%dT%H:%M:%S")),
-        )
-        conn.commit()
-        print(f"✔ Applied {f.name}")
+    if baked is not None:
+        stats = {m.name: BakedStat(len(m.sql)) for m in files}
+        fp_key, fp = "manifest_fingerprint", manifest_fingerprint(files)
+    else:
+        stats = {e.name: e.stat() for e in entries}
+        # same files, sizes and mtimes as the last successful run: nothing to verify or apply
+        fp_key = f"dir_fingerprint:{mig_dir.resolve()}"
+        fp = dir_fingerprint(stats)
+    row = conn.execute(FINGERPRINT_GET_SQL, (fp_key,)).fetchone()
+    if row and row[0] == fp:
+        print("All migrations up to date.")
+        return 0
+
+    applied = list_applied(conn, [f.name for f in files])
+
+    def unchanged(f: Path) -> bool:
+        # applied and untouched since it was last verified: no need to read it
+        if f.name not in applied:
+            return False
+        st = stats[f.name]
+        return applied[f.name][1:] == (st.st_size, st.st_mtime_ns)
 
+    if baked is not None:
+        checksums = {m.name: m.checksum for m in files}  # hashed at bake time
+    else:
+        # hash everything that needs it up front; applying below stays serial (one writer)
+        checksums = cached_checksums(conn, [f for f in files if not unchanged(f)], stats)
+
+    # one transaction for the whole run: a single commit, and a failure leaves
+    # the DB as it was before the run
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rc = apply_pending(conn, files, applied, stats, checksums)
+        if not rc:
+            conn.execute(FINGERPRINT_SET_SQL, (fp_key, fp))
+    except BaseException:
+        conn.rollback()
+        raise
+    if rc:
+        conn.rollback()
+        print("Rolled back; nothing from this run was applied.", file=sys.stderr)
+        return rc
+    conn.commit()
     print("All migrations up to date.")
     return 0
 
@@ -0,0 +1,49 @@
+# tests/test_migrate.py
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import migrate  # noqa: E402
+
+
+class SplitSqlTest(unittest.TestCase):
+    def _apply(self, sql: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(":memory:")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "001.sql"
+            path.write_text(sql, encoding="utf-8")
+            migrate.apply_sql(conn, path)
+        return conn
+
+    def test_last_statement_without_semicolon_before_comment_runs(self):
+        conn = self._apply("CREATE TABLE b(x);\nINSERT INTO b VALUES (5) -- last no semicolon")
+        self.assertEqual(conn.execute("SELECT x FROM b").fetchall(), [(5,)])
+
+    def test_last_statement_without_semicolon_runs(self):
+        conn = self._apply("CREATE TABLE b(x);\nINSERT INTO b VALUES (5)")
+        self.assertEqual(conn.execute("SELECT x FROM b").fetchall(), [(5,)])
+
+    def test_trailing_comment_only_is_fine(self):
+        conn = self._apply("CREATE TABLE b(x);\n-- done\n")
+        self.assertEqual(conn.execute("SELECT count(*) FROM b").fetchone(), (0,))
+
+    def test_grouped_inserts_keep_rows_after_comments(self):
+        conn = self._apply(
+            "CREATE TABLE b(x);\n"
+            "INSERT INTO b VALUES (1) -- first (one)\n;\n"
+            "INSERT INTO b VALUES (2);\n"
+            "INSERT INTO b VALUES (3);\n"
+        )
+        self.assertEqual(conn.execute("SELECT x FROM b ORDER BY x").fetchall(), [(1,), (2,), (3,)])
+
+    def test_incomplete_tail_raises(self):
+        with self.assertRaises(sqlite3.OperationalError):
+            list(migrate.split_sql("CREATE TABLE b(x);\nINSERT INTO b VALUES ('abc"))
+
+
+if __name__ == "__main__":
+    unittest.main()